@@ -10,14 +10,16 @@ Orchestrates the generation pipeline using:
 """
 
 import sys
-import json
+import csv
 import uuid
+import asyncio
 import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import random
-from dotenv import load_dotenv
+import orjson
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.resolve()
@@ -26,11 +28,12 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from src.config import Config
 from src.intent_manager import IntentManager
 from src.similarity_checker import SimilarityChecker
-from src.prompt_builder import PromptBuilder
+from src.prompt_builder import PromptBuilder, load_agent_prompt
 from src.question_generator import QuestionGenerator
 from src.agent import create_agent, PipelineDeps
 from src.evaluation_metrics import EvaluationMetrics
 from src.persona_manager import PersonaManager
+from src.embedding_registry import EmbeddingRegistry
 
 
 # ── Logging Setup ────────────────────────────────────────────────────────────
@@ -48,44 +51,76 @@ logger = logging.getLogger(__name__)
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
-def save_results_csv(questions, filepath):
-    """Save generated questions to CSV."""
-    import pandas as pd
+CSV_COLUMNS = [
+    "question", "intent_ids", "intent_weights", "difficulty",
+    "similarity_score", "provider", "model", "confusion_points",
+]
+
+
+def open_results_csv(filepath):
+    """Open the run's results CSV and write its header. Returns (file, writer)."""
+    csv_file = open(filepath, "w", newline="", encoding="utf-8")
+    writer = csv.DictWriter(csv_file, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    return csv_file, writer
+
+
+def write_results_csv(questions, csv_file, writer):
+    """Write one batch of generated questions to the open results CSV."""
     if not questions:
         return
-    
-    df = pd.DataFrame(questions)
+
     # Flatten intents for CSV readability
-    df["intent_ids"] = df["intents"].apply(lambda x: [i[0] for i in x])
-    df["intent_weights"] = df["intents"].apply(lambda x: [i[1] for i in x])
-    
-    # Ensure provider columns exist
-    if "provider" not in df.columns:
-        df["provider"] = "unknown"
-    if "model" not in df.columns:
-        df["model"] = "unknown"
-        
-    cols = [
-        "question", "intent_ids", "intent_weights", "difficulty", 
-        "similarity_score", "provider", "model", "confusion_points"
-    ]
-    # Keep only columns that exist
-    cols = [c for c in cols if c in df.columns]
-    
-    df[cols].to_csv(filepath, index=False, encoding="utf-8")
-    logger.info("Saved %d questions to %s", len(df), filepath)
+    writer.writerows(
+        {
+            "question": q["question"],
+            "intent_ids": [i[0] for i in q["intents"]],
+            "intent_weights": [i[1] for i in q["intents"]],
+            "difficulty": q.get("difficulty"),
+            "similarity_score": q.get("similarity_score"),
+            "provider": q.get("provider", "unknown"),
+            "model": q.get("model", "unknown"),
+            "confusion_points": q.get("confusion_points"),
+        }
+        for q in questions
+    )
+    csv_file.flush()
+    logger.info("Wrote %d questions to %s", len(questions), csv_file.name)
+
+
+def export_parquet(csv_path):
+    """Consolidate the run's CSV into a single Parquet file."""
+    import pandas as pd
+    parquet_path = Path(csv_path).with_suffix(".parquet")
+    try:
+        pd.read_csv(csv_path).to_parquet(parquet_path, index=False)
+    except ImportError:
+        logger.warning("pyarrow not installed, skipping Parquet export")
+        return
+    logger.info("Saved Parquet copy to %s", parquet_path)
 
 
 def save_metrics(metrics, filepath):
     """Save generation metrics to JSON."""
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(metrics, f, indent=2, default=str)
+    option = (
+        orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+    )
+    with open(filepath, "wb") as f:
+        f.write(orjson.dumps(metrics, option=option, default=str))
     logger.info("Saved metrics to %s", filepath)
 
 
 # ── Main Pipeline ────────────────────────────────────────────────────────────
 
 def main():
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        pass
+
+
+async def main_async():
     parser = argparse.ArgumentParser(description="Multi-Intent Question Generator")
     parser.add_argument("--batch-size", type=int, default=10, help="Questions per batch")
     parser.add_argument("--batches", type=int, default=1, help="Number of batches")
@@ -106,7 +141,6 @@ def main():
         args.batches = (args.total + args.batch_size - 1) // args.batch_size
 
     # ── 1. Configuration ─────────────────────────────────────────────────
-    load_dotenv()
     config = Config()
     
     if args.strategy:
@@ -132,20 +166,15 @@ def main():
     )
     logger.info("IntentManager: %d active intents", len(intent_manager.active_intent_ids))
 
-    # Embedding model
-    logger.info("Loading embedding model: %s", config.EMBEDDING_MODEL)
-    import torch
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    logger.info("Using device: %s", device)
-    
-    from sentence_transformers import SentenceTransformer
-    embedding_model = SentenceTransformer(config.EMBEDDING_MODEL, device=device)
+    # Embedding model (one shared, pre-warmed instance)
+    embedding_model = EmbeddingRegistry.get(config)
 
     # Similarity Checker
     similarity_checker = SimilarityChecker(config, embedding_model=embedding_model)
+    similarity_checker.load_embedding_cache(config.EMBEDDING_CACHE_PATH)
 
     # Prompt Builder
-    agent_prompt = config.AGENT_PROMPT_PATH.read_text(encoding="utf-8")
+    agent_prompt = load_agent_prompt(config.AGENT_PROMPT_PATH)
     prompt_builder = PromptBuilder(agent_prompt, config=config)
 
     # MongoDB (optional)
@@ -169,7 +198,7 @@ def main():
     
     # Generate/Load Persona
     logger.info("Initializing Persona...")
-    current_persona = persona_manager.generate_persona(context=args.persona)
+    current_persona = await persona_manager.generate_persona_async(context=args.persona)
     logger.info("Using Persona: %s (%s, %s)", current_persona.name, current_persona.age, current_persona.region)
 
     # Pydantic AI Agent & Dependencies
@@ -204,62 +233,117 @@ def main():
     # ── 3. Generation Loop ───────────────────────────────────────────────
     
     total_new_questions = []
+    pending_inserts = []       # (questions, batch_id) awaiting a bulk Mongo write
+    pending_count = 0
     start_time = datetime.now()
     batch_id = start_time.strftime("%Y%m%d_%H%M%S")
+    csv_path = config.OUTPUT_DIR / "csv" / f"generated_questions_{batch_id}.csv"
+
+    # One CSV stays open for the whole run; batch writes run on one
+    # background thread (keeps row order) so disk I/O overlaps with the
+    # next wave's LLM calls
+    csv_file, csv_writer = open_results_csv(csv_path)
+    io_pool = ThreadPoolExecutor(max_workers=1)
+    csv_futures = []
 
     logger.info("Starting generation: %d batches of %d", args.batches, args.batch_size)
 
+    # Batches run in waves of MAX_CONCURRENCY so their LLM round-trips overlap
+    wave_size = max(1, config.MAX_CONCURRENCY)
+    waves = [
+        range(wave_start, min(wave_start + wave_size, args.batches))
+        for wave_start in range(0, args.batches, wave_size)
+    ]
+
+    def start_wave(wave):
+        return asyncio.create_task(generator.generate_batches_async(
+            [
+                {
+                    "batch_size": args.batch_size,
+                    "difficulty": args.difficulty,
+                    "intent_mix_size": args.mix_size if args.mix_size else random.choice(config.INTENT_MIX_SIZES),
+                    "persona": current_persona,
+                    "target_intents": args.intents.split(",") if args.intents else None,
+                }
+                for _ in wave
+            ],
+            return_exceptions=True,
+        ))
+
+    # The next wave is started before the current one is awaited. Its LLM
+    # calls queue on the generator's MAX_CONCURRENCY semaphore, so they go
+    # out as soon as this wave's generation calls finish, overlapping with
+    # this wave's quality verification.
+    next_wave = start_wave(waves[0]) if waves else None
+
     try:
-        for i in range(args.batches):
-            logger.info("Batch %d/%d", i + 1, args.batches)
-            
+        for n, wave in enumerate(waves):
+            logger.info("Batches %d-%d/%d", wave.start + 1, wave.stop, args.batches)
+
             # Generate
-            batch_questions = generator.generate_batch(
-                batch_size=args.batch_size,
-                difficulty=args.difficulty,
-                intent_mix_size=args.mix_size if args.mix_size else random.choice(config.INTENT_MIX_SIZES),
-                persona=current_persona,
-                target_intents=args.intents.split(",") if args.intents else None,
-            )
-            
-            if batch_questions:
-                total_new_questions.extend(batch_questions)
-                
-                # Save intermediate CSV
-                save_results_csv(
-                    total_new_questions, 
-                    str(config.OUTPUT_DIR / "csv" / f"generated_questions_{batch_id}.csv")
-                )
-                
-                # Save to Mongo immediately if enabled (handled via tool call in agent? 
-                # No, agent tool handles it independently if invoked. 
-                # But we might want to ensure saving here too if agent didn't save it.)
-                # Actually, the agent tool `save_to_mongo` is available for the LLM to call, 
-                # but typically question generation logic calls LLM to *get* questions, 
-                # then we save them. 
-                # The `save_to_mongo` tool is more for "task-based" agents. 
-                # Here we are just using the agent to generate text.
-                # So we should explicit save here.
-                if mongo:
-                    mongo.insert_questions(batch_questions, batch_id=batch_id)
-
-            # Evolve intent weights
-            if not args.dry_run and config.EVOLUTION_FREQUENCY > 0:
-                if (i + 1) % (config.EVOLUTION_FREQUENCY // config.BATCH_SIZE) == 0:
-                    intent_manager.evolve_weights(
-                        strategy=config.EVOLUTION_STRATEGY
+            current_wave = next_wave
+            next_wave = start_wave(waves[n + 1]) if n + 1 < len(waves) else None
+            results = await current_wave
+
+            for i, batch_questions in zip(wave, results):
+                if isinstance(batch_questions, Exception):
+                    logger.error("Batch %d failed: %s", i + 1, batch_questions)
+                    continue
+
+                if batch_questions:
+                    total_new_questions.extend(batch_questions)
+                    
+                    # Write this batch to the run's CSV
+                    csv_futures.append(
+                        io_pool.submit(write_results_csv, batch_questions, csv_file, csv_writer)
                     )
-
-    except KeyboardInterrupt:
+                    
+                    # Queue for Mongo; once MONGO_FLUSH_SIZE questions are buffered
+                    # they are handed to MongoStore's background writer thread.
+                    # (The agent's `save_to_mongo` tool is for task-based agents;
+                    # here the agent only generates text, so we save explicitly.)
+                    if mongo:
+                        pending_inserts.append((batch_questions, batch_id))
+                        pending_count += len(batch_questions)
+                        if pending_count >= config.MONGO_FLUSH_SIZE:
+                            mongo.flush_many_async(pending_inserts)
+                            pending_inserts, pending_count = [], 0
+
+                # Evolve intent weights
+                if not args.dry_run and config.EVOLUTION_FREQUENCY > 0:
+                    if (i + 1) % (config.EVOLUTION_FREQUENCY // config.BATCH_SIZE) == 0:
+                        intent_manager.evolve_weights(
+                            strategy=config.EVOLUTION_STRATEGY
+                        )
+
+    except (KeyboardInterrupt, asyncio.CancelledError):
         logger.warning("Generation interrupted by user.")
     except Exception as e:
         logger.error("Generation failed: %s", e, exc_info=True)
     finally:
+        if next_wave is not None and not next_wave.done():
+            next_wave.cancel()
+
         # ── 4. Finalize & Metrics ────────────────────────────────────────
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
         logger.info("Generation finished. Total questions: %d", len(total_new_questions))
+
+        io_pool.shutdown(wait=True)
+        for future in csv_futures:
+            if future.exception():
+                logger.error("CSV write failed: %s", future.exception())
+        csv_file.close()
+        if total_new_questions:
+            export_parquet(csv_path)
+
+        if mongo:
+            # Queue the remainder, then wait for the background writer
+            mongo.flush_many_async(pending_inserts)
+            mongo.close()
+
+        similarity_checker.save_embedding_cache(config.EMBEDDING_CACHE_PATH)
         
         # Calculate metrics
         metrics = evaluator.calculate_metrics(total_new_questions)
@@ -277,6 +361,7 @@ def main():
             "intent_evolution": intent_manager.get_evolution_log(),
             "generator_stats": generator.stats,
         }
+        evaluator.close()
         save_metrics(metrics_combined, str(config.OUTPUT_DIR / "generation_metrics.json"))
         save_metrics(
             intent_manager.get_evolution_log(),
@@ -9,11 +9,11 @@ Uses agent-based QuestionGenerator for robust multi-provider handling.
 """
 
 import sys
+import asyncio
 import logging
 import argparse
 from pathlib import Path
-from apscheduler.schedulers.blocking import BlockingScheduler
-from dotenv import load_dotenv
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.resolve()
@@ -23,10 +23,11 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from src.config import Config
 from src.intent_manager import IntentManager
 from src.similarity_checker import SimilarityChecker
-from src.prompt_builder import PromptBuilder
+from src.prompt_builder import PromptBuilder, load_agent_prompt
 from src.question_generator import QuestionGenerator
 from src.evaluation_metrics import EvaluationMetrics
 from src.agent import create_agent, PipelineDeps
+from src.embedding_registry import EmbeddingRegistry
 
 # Logging
 logging.basicConfig(
@@ -39,8 +40,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# State
-scheduler = BlockingScheduler()
+# State — jobs are coroutines sharing one event loop, so their LLM I/O overlaps
+scheduler = AsyncIOScheduler()
 _components = {}
 
 
@@ -49,7 +50,6 @@ def init_components():
     if _components:
         return _components
 
-    load_dotenv()
     config = Config()
 
     logger.info("Initializing Scheduler Components...")
@@ -57,14 +57,11 @@ def init_components():
     # Core logic
     intent_mgr = IntentManager(str(config.INTENT_TAXONOMY_PATH), config=config)
     
-    from sentence_transformers import SentenceTransformer
-    import torch
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    logger.info("Using device: %s", device)
-    embedding_model = SentenceTransformer(config.EMBEDDING_MODEL, device=device)
+    embedding_model = EmbeddingRegistry.get(config)
     sim_checker = SimilarityChecker(config, embedding_model=embedding_model)
+    sim_checker.load_embedding_cache(config.EMBEDDING_CACHE_PATH)
 
-    prompt_content = config.AGENT_PROMPT_PATH.read_text(encoding="utf-8")
+    prompt_content = load_agent_prompt(config.AGENT_PROMPT_PATH)
     prompt_builder = PromptBuilder(prompt_content, config=config)
 
     # Mongo
@@ -108,7 +105,7 @@ def init_components():
         config=config,
     )
 
-    evaluator = EvaluationMetrics(embedding_model=embedding_model)
+    evaluator = EvaluationMetrics(embedding_model=embedding_model, mongo_store=mongo)
 
     _components.update({
         "config": config,
@@ -123,7 +120,7 @@ def init_components():
     return _components
 
 
-def run_question_cron(batch_size=50, difficulty="hard"):
+async def run_question_cron(batch_size=50, difficulty="hard"):
     """
     Main scheduled job: Generate batches of questions.
     """
@@ -131,7 +128,7 @@ def run_question_cron(batch_size=50, difficulty="hard"):
     c = init_components()
     
     try:
-        questions = c["generator"].generate_batch(
+        questions = await c["generator"].generate_batch_async(
             batch_size=batch_size,
             difficulty=difficulty
         )
@@ -143,16 +140,23 @@ def run_question_cron(batch_size=50, difficulty="hard"):
             
             # Save to Mongo (if configured)
             if c["mongo"]:
-                count = c["mongo"].insert_questions(questions, batch_id="cron_general")
-                logger.info("Saved %d questions to Mongo.", count)
+                c["mongo"].insert_questions_async(questions, batch_id="cron_general")
+                logger.info("Queued %d questions for Mongo.", len(questions))
+
+                # Collection-wide totals, aggregated server-side once the
+                # writer has stored this batch
+                await asyncio.to_thread(c["mongo"].wait_for_writes)
+                stored = await asyncio.to_thread(c["evaluator"].calculate_stored_metrics)
+                logger.info("Collection metrics: %s", stored)
                 
     except Exception as e:
         logger.error("Error in Question Cron: %s", e, exc_info=True)
-    
+
+    c["similarity_checker"].save_embedding_cache(c["config"].EMBEDDING_CACHE_PATH)
     logger.info("--- Question Cron Finished ---")
 
 
-def run_intent_cron(intent_ids=None, batch_size=20):
+async def run_intent_cron(intent_ids=None, batch_size=20):
     """
     Scheduled job: Target specific intents (or under-represented ones).
     """
@@ -167,21 +171,51 @@ def run_intent_cron(intent_ids=None, batch_size=20):
     try:
         # Generate using standard batch logic, relying on intent manager sampling
         # TODO: Add specific intent targeting to generator if needed
-        questions = c["generator"].generate_batch(
+        questions = await c["generator"].generate_batch_async(
             batch_size=batch_size,
             difficulty="medium", # simpler for targeted learning?
             intent_mix_size=2
         )
         
         if questions and c["mongo"]:
-            c["mongo"].insert_questions(questions, batch_id="cron_intent")
+            c["mongo"].insert_questions_async(questions, batch_id="cron_intent")
 
     except Exception as e:
         logger.error("Error in Intent Cron: %s", e, exc_info=True)
 
+    c["similarity_checker"].save_embedding_cache(c["config"].EMBEDDING_CACHE_PATH)
     logger.info("--- Intent Cron Finished ---")
 
 
+async def run_once(mode):
+    """Run the selected cron jobs once, concurrently."""
+    jobs = []
+    if mode in ["questions", "both"]:
+        jobs.append(run_question_cron(batch_size=10)) # smaller batch for run-once
+    if mode in ["intents", "both"]:
+        jobs.append(run_intent_cron(batch_size=5))
+    await asyncio.gather(*jobs)
+    close_components()
+
+
+async def serve():
+    """Start the scheduler on the running loop and wait until cancelled."""
+    scheduler.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        scheduler.shutdown(wait=False)
+        close_components()
+
+
+def close_components():
+    """Flush queued background Mongo writes and stop encode worker pools."""
+    if _components.get("mongo"):
+        _components["mongo"].close()
+    if _components.get("evaluator"):
+        _components["evaluator"].close()
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--mode", choices=["questions", "intents", "both"], default="both")
@@ -193,10 +227,7 @@ def main():
     init_components()
     
     if args.run_once:
-        if args.mode in ["questions", "both"]:
-            run_question_cron(batch_size=10) # smaller batch for run-once
-        if args.mode in ["intents", "both"]:
-            run_intent_cron(batch_size=5)
+        asyncio.run(run_once(args.mode))
         sys.exit(0)
 
     # Schedule jobs
@@ -220,8 +251,8 @@ def main():
         logger.info("Scheduled Intent Cron every %d min", args.interval_minutes)
 
     try:
-        logger.info("Scheduler started via BlockingScheduler. Press Ctrl+C to stop.")
-        scheduler.start()
+        logger.info("Scheduler started via AsyncIOScheduler. Press Ctrl+C to stop.")
+        asyncio.run(serve())
     except (KeyboardInterrupt, SystemExit):
         pass
 
@@ -5,16 +5,19 @@ Replaces the custom ProviderPool with pydantic-ai's built-in model abstractions.
 Providers: Groq → Gemini → HuggingFace (in priority order, no Anthropic).
 """
 
-import json
-import os
+import asyncio
 import logging
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 
+import httpx
+import orjson
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent, RunContext
 
 from .config import Config
+from .json_utils import extract_json
+from .rate_limiter import rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -54,26 +57,93 @@ class PipelineDeps:
 # Build the FallbackModel from config
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _build_fallback_model(config: Config):
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that keeps a separate connection pool per event loop.
+
+    Pooled connections belong to the loop that opened them, and every sync
+    wrapper (generate_batch, verify_batch, run_sync, ...) runs in a fresh
+    asyncio.run loop. Reusing one pool across them would hand out
+    connections from a closed loop ("Event loop is closed").
     """
-    Build a pydantic-ai FallbackModel from configured provider keys.
+
+    def __init__(self, limits: httpx.Limits):
+        self._limits = limits
+        self._pools: Dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        """Return the pool bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            # Pools of finished loops cannot be closed any more; drop them
+            self._pools = {lp: p for lp, p in self._pools.items() if not lp.is_closed()}
+            pool = self._pools[loop] = httpx.AsyncHTTPTransport(limits=self._limits)
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self):
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _shared_http_client(config: Config) -> httpx.AsyncClient:
+    """
+    Return the process-wide httpx client used by every provider model.
+
+    One pooled client keeps TLS connections alive across batches and lifts
+    httpx's default 100-connection cap, which otherwise throttles
+    concurrent generation. Idle connections are kept for
+    HTTP_KEEPALIVE_EXPIRY seconds rather than httpx's 5, since the gap
+    between waves or verifier calls is usually longer than that. The
+    connection pool itself is per event loop (see _PerLoopTransport).
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            transport=_PerLoopTransport(httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+            )),
+            timeout=config.HTTP_TIMEOUT,
+        )
+    return _http_client
+
+
+def _build_models(config: Config) -> list:
+    """
+    Build one pydantic-ai model per configured provider key.
 
     Priority: Groq → Gemini → HuggingFace (no Anthropic).
     For providers with multiple keys, creates multiple model instances.
+    All models share one pooled HTTP client (see _shared_http_client) and
+    each key is wrapped with its own RPM/TPM limiter (see rate_limiter).
     """
-    from pydantic_ai.models.fallback import FallbackModel
-
     models = []
+    http_client = _shared_http_client(config)
 
     # ── Groq models ──────────────────────────────────────────────────────
     groq_keys = getattr(config, "GROQ_API_KEYS", [])
     groq_model_name = getattr(config, "GROQ_MODEL", "llama-3.1-70b-versatile")
     if groq_keys:
         from pydantic_ai.models.groq import GroqModel
+        from pydantic_ai.providers.groq import GroqProvider
         for key in groq_keys:
-            # GroqModel doesn't accept api_key param, so set env var
-            os.environ["GROQ_API_KEY"] = key
-            models.append(GroqModel(groq_model_name))
+            # Each model gets a provider bound to its own key (own quota bucket)
+            models.append(rate_limited(
+                GroqModel(
+                    groq_model_name,
+                    provider=GroqProvider(api_key=key, http_client=http_client),
+                ),
+                config, "groq", key,
+            ))
             logger.info("Added Groq model: %s", groq_model_name)
 
     # ── Gemini models ────────────────────────────────────────────────────
@@ -81,10 +151,15 @@ def _build_fallback_model(config: Config):
     gemini_model_name = getattr(config, "GEMINI_MODEL", "gemini-2.0-flash")
     if gemini_keys:
         from pydantic_ai.models.google import GoogleModel
+        from pydantic_ai.providers.google import GoogleProvider
         for key in gemini_keys:
-            # GoogleModel expects GOOGLE_API_KEY env var
-            os.environ["GOOGLE_API_KEY"] = key
-            models.append(GoogleModel(gemini_model_name))
+            models.append(rate_limited(
+                GoogleModel(
+                    gemini_model_name,
+                    provider=GoogleProvider(api_key=key, http_client=http_client),
+                ),
+                config, "gemini", key,
+            ))
             logger.info("Added Gemini model: %s", gemini_model_name)
 
     # ── HuggingFace models ───────────────────────────────────────────────
@@ -92,10 +167,17 @@ def _build_fallback_model(config: Config):
     hf_model_name = getattr(config, "HF_MODEL", "Qwen/Qwen3-32Bclear")
     if hf_keys:
         from pydantic_ai.models.huggingface import HuggingFaceModel
+        from pydantic_ai.providers.huggingface import HuggingFaceProvider
         for key in hf_keys:
-            # HuggingFaceModel expects HF_TOKEN env var
-            os.environ["HF_TOKEN"] = key
-            models.append(HuggingFaceModel(hf_model_name))
+            # The HF inference client manages its own session, so it does
+            # not take the shared httpx client.
+            models.append(rate_limited(
+                HuggingFaceModel(
+                    hf_model_name,
+                    provider=HuggingFaceProvider(api_key=key),
+                ),
+                config, "huggingface", key,
+            ))
             logger.info("Added HuggingFace model: %s", hf_model_name)
 
     # ── OpenRouter models ───────────────────────────────────────────────
@@ -103,14 +185,20 @@ def _build_fallback_model(config: Config):
     or_model_name = getattr(config, "OPENROUTER_MODEL", "arcee-ai/trinity-large-preview:free")
     if or_keys:
         from pydantic_ai.models.openai import OpenAIModel
+        from pydantic_ai.providers.openai import OpenAIProvider
         for key in or_keys:
-            # OpenRouter uses OpenAI client interface
-            # Swap env var for safety/consistency with other providers
-            os.environ["OPENAI_API_KEY"] = key
-            os.environ["OPENAI_BASE_URL"] = "https://openrouter.ai/api/v1"
-            
-            # We must pass base_url explicitly or set OPENAI_BASE_URL
-            models.append(OpenAIModel(or_model_name))
+            # OpenRouter uses the OpenAI client interface
+            models.append(rate_limited(
+                OpenAIModel(
+                    or_model_name,
+                    provider=OpenAIProvider(
+                        base_url="https://openrouter.ai/api/v1",
+                        api_key=key,
+                        http_client=http_client,
+                    ),
+                ),
+                config, "openrouter", key,
+            ))
             logger.info("Added OpenRouter model: %s", or_model_name)
 
     if not models:
@@ -118,28 +206,107 @@ def _build_fallback_model(config: Config):
             "No API keys configured for any provider. "
             "Set GROQ_API_KEYS, GEMINI_API_KEYS, or HF_API_KEYS in your .env file."
         )
+    return models
 
+
+def _build_fallback_model(config: Config):
+    """Build a pydantic-ai FallbackModel over all configured provider keys."""
+    from pydantic_ai.models.fallback import FallbackModel
+
+    models = _build_models(config)
     if len(models) == 1:
         return models[0]
 
     return FallbackModel(*models)
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# Provider racing
+# ═══════════════════════════════════════════════════════════════════════════
+
+class RacingAgent:
+    """
+    Runs the same prompt on one Agent per provider and keeps the first success.
+
+    Unlike FallbackModel, which tries providers one after another, all
+    providers start at once and the losers are cancelled as soon as one
+    returns. Latency becomes the fastest provider's instead of the sum of
+    failed attempts plus the winner's, at the cost of spending quota on every
+    raced provider. Enabled with RACE_PROVIDERS.
+
+    A reply that is not valid JSON counts as a failure, so the next provider
+    to finish can still win.
+    """
+
+    def __init__(self, agents: List[Agent]):
+        self.agents = agents
+
+    async def run(self, prompt: str, deps=None, **kwargs):
+        """Race all agents; return the first successful run result."""
+        tasks = [
+            asyncio.create_task(agent.run(prompt, deps=deps, **kwargs))
+            for agent in self.agents
+        ]
+        errors = []
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        result = task.result()
+                        try:
+                            orjson.loads(extract_json(str(result.output)))
+                            return result
+                        except orjson.JSONDecodeError as e:
+                            error = e
+                    errors.append(error)
+                    logger.warning("Racing provider failed: %s", error)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise RuntimeError(f"All {len(tasks)} racing providers failed") from errors[-1]
+
+    def run_sync(self, prompt: str, deps=None, **kwargs):
+        """Synchronous wrapper around :meth:`run`."""
+        return asyncio.run(self.run(prompt, deps=deps, **kwargs))
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Create the Agent
 # ═══════════════════════════════════════════════════════════════════════════
 
-def create_agent(config: Config) -> Agent:
+def create_agent(config: Config):
     """
     Create and configure the pydantic-ai Agent with FallbackModel and tools.
 
-    The Agent uses tools to:
-      - Sample intent mixes from the IntentManager
-      - Find similar questions for deduplication context
-      - Check for duplicate questions
+    With RACE_PROVIDERS enabled (and more than one provider key), returns a
+    RacingAgent that runs one tool-equipped Agent on each of the first
+    RACE_WIDTH provider models instead.
+
+    Intent sampling, reference retrieval and duplicate checks are done by
+    QuestionGenerator before and after the call, so each generation is a
+    single model round-trip. The only tool left is ``save_to_mongo``.
     """
-    model = _build_fallback_model(config)
+    models = _build_models(config)
+    if config.RACE_PROVIDERS and len(models) > 1:
+        raced = models[:config.RACE_WIDTH] if config.RACE_WIDTH > 0 else models
+        logger.info("Racing %d of %d provider models per call", len(raced), len(models))
+        return RacingAgent([_make_agent(model, config) for model in raced])
+
+    if len(models) == 1:
+        return _make_agent(models[0], config)
 
+    from pydantic_ai.models.fallback import FallbackModel
+    return _make_agent(FallbackModel(*models), config)
+
+
+def _make_agent(model, config: Config) -> Agent:
+    """Build a question-generation Agent on ``model`` and register its tools."""
     agent = Agent(
         model,
         deps_type=PipelineDeps,
@@ -180,65 +347,6 @@ def create_agent(config: Config) -> Agent:
 
     # ── Register tools ───────────────────────────────────────────────────
 
-    @agent.tool
-    def sample_intents(ctx: RunContext[PipelineDeps], n_intents: int) -> str:
-        """Sample a weighted mix of intents for question generation.
-
-        Args:
-            n_intents: Number of intents to mix (typically 2-3).
-
-        Returns:
-            JSON string with intent IDs, weights, names, descriptions, and key signals.
-        """
-        deps = ctx.deps
-        intent_mix = deps.intent_manager.sample_intent_mix(n_intents=n_intents)
-        intent_ids = [iid for iid, _ in intent_mix]
-        details = deps.intent_manager.get_intent_details(intent_ids)
-
-        result = []
-        for (iid, weight), detail in zip(intent_mix, details):
-            result.append({
-                "intent_id": iid,
-                "weight": weight,
-                "name": detail["name"],
-                "description": detail.get("description", ""),
-                "primary_intent": detail.get("primary_intent", ""),
-                "key_signals": detail.get("key_signals", []),
-            })
-        return json.dumps(result, ensure_ascii=False)
-
-    @agent.tool
-    def find_similar_questions(ctx: RunContext[PipelineDeps], query: str, top_k: int = 5) -> str:
-        """Find existing questions similar to a query for reference/anti-duplication.
-
-        Args:
-            query: A representative query string (e.g. intent names + key signals).
-            top_k: Maximum number of similar questions to return.
-
-        Returns:
-            JSON string with similar questions and their similarity scores.
-        """
-        deps = ctx.deps
-        results = deps.similarity_checker.find_similar_questions(query, top_k=top_k)
-        return json.dumps(
-            [{"question": q, "similarity": round(s, 3)} for q, s in results],
-            ensure_ascii=False,
-        )
-
-    @agent.tool
-    def check_duplicate(ctx: RunContext[PipelineDeps], question: str) -> str:
-        """Check if a question is too similar to existing ones.
-
-        Args:
-            question: The question text to check.
-
-        Returns:
-            JSON string with is_duplicate boolean and max_similarity score.
-        """
-        deps = ctx.deps
-        is_dup, max_sim = deps.similarity_checker.is_duplicate(question)
-        return json.dumps({"is_duplicate": is_dup, "max_similarity": round(max_sim, 4)})
-
     @agent.tool
     def save_to_mongo(
         ctx: RunContext[PipelineDeps],
@@ -256,34 +364,10 @@ def create_agent(config: Config) -> Agent:
         """
         deps = ctx.deps
         if deps.mongo_store is None:
-            return json.dumps({"inserted": 0, "reason": "MongoDB not configured"})
-        questions = json.loads(questions_json)
+            return orjson.dumps({"inserted": 0, "reason": "MongoDB not configured"}).decode()
+        questions = orjson.loads(questions_json)
         count = deps.mongo_store.insert_questions(questions, batch_id=batch_id)
-        return json.dumps({"inserted": count})
+        return orjson.dumps({"inserted": count}).decode()
 
-    logger.info("Agent created with %d tools", len(agent._toolsets) if hasattr(agent, '_toolsets') else 4)
+    logger.info("Agent created with %d tools", len(agent._toolsets) if hasattr(agent, '_toolsets') else 1)
     return agent
-
-
-# ═══════════════════════════════════════════════════════════════════════════
-# Direct generation helper (bypasses agent's tool-calling loop)
-# ═══════════════════════════════════════════════════════════════════════════
-
-def generate_with_agent(
-    agent: Agent,
-    deps: PipelineDeps,
-    prompt: str,
-    system_prompt: Optional[str] = None,
-) -> str:
-    """
-    Run the agent with a generation prompt and return raw text.
-
-    This is a direct LLM call — the prompt is fully constructed by the
-    QuestionGenerator, so we just need the LLM to produce JSON output.
-    """
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-
-    result = agent.run_sync(prompt, deps=deps)
-    return result.output
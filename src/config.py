@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Class attributes below read the environment at import time, so .env is
+# loaded exactly once here; entry points do not need to call it again.
 load_dotenv()
 
 
@@ -28,6 +30,7 @@ class Config:
     EXISTING_DATA_DIR = PROJECT_ROOT.parent / "csv"
     QUESTIONS_CSV_PATH = EXISTING_DATA_DIR / "questions.csv"
     EMBEDDINGS_CSV_PATH = EXISTING_DATA_DIR / "embeddings.csv"
+    EMBEDDINGS_NPY_PATH = EXISTING_DATA_DIR / "embeddings.npy"  # Normalized float32 copy, memory-mapped
 
     # Outputs
     OUTPUT_DIR = PROJECT_ROOT / "outputs"
@@ -36,6 +39,10 @@ class Config:
 
     # ── Embedding Model ─────────────────────────────────────────────────
     EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    EMBEDDING_MAX_SEQ_LENGTH = 128    # Questions are short; avoid padding to 512
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # 'torch' | 'onnx' | 'onnx-int8'
+    EMBEDDING_CACHE_SIZE = 10_000     # LRU entries of cached query embeddings
+    EMBEDDING_CACHE_PATH = OUTPUT_DIR / "emb_cache.npz"
 
     # ── Multi-Provider API Keys ─────────────────────────────────────────
     # Set comma-separated keys in .env, e.g.:  GROQ_API_KEYS=key1,key2,key3
@@ -55,6 +62,18 @@ class Config:
 
     # ── Rate Limiting ───────────────────────────────────────────────────
     RATE_LIMIT_COOLDOWN = 60*2          # Seconds to cooldown a key after 429
+    RATE_LIMIT_RETRIES = 3              # 429 retries per key before falling back
+    RATE_LIMIT_BACKOFF = 1.0            # Base backoff in seconds (doubled, jittered)
+
+    # Per-key budgets per provider (0 = unlimited)
+    PROVIDER_RPM = {"groq": 30, "gemini": 10, "huggingface": 60, "openrouter": 20}
+    PROVIDER_TPM = {"groq": 12000, "gemini": 250000, "huggingface": 0, "openrouter": 0}
+
+    # ── HTTP Client (shared by all provider models) ─────────────────────
+    HTTP_MAX_CONNECTIONS = 2000
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 1500
+    HTTP_KEEPALIVE_EXPIRY = 300.0     # Seconds an idle connection stays open (httpx default: 5)
+    HTTP_TIMEOUT = 120.0              # Seconds per provider request
 
     # ── Generation Parameters ───────────────────────────────────────────
     BATCH_SIZE = 50
@@ -67,6 +86,14 @@ class Config:
     DUPLICATE_THRESHOLD = 0.85        # Reject if similarity >= this
     SIMILAR_REFERENCE_THRESHOLD = 0.70  # Retrieve references above this
 
+    # ── Similarity Index ────────────────────────────────────────────────
+    SIMILARITY_INDEX = os.getenv("SIMILARITY_INDEX", "exact")  # 'exact' | 'flat' | 'hnsw' (needs faiss-cpu)
+    HNSW_M = 32                       # Graph neighbours per node
+    HNSW_EF_SEARCH = 64               # Search breadth (higher = better recall, slower)
+    SIMILARITY_KERNEL = os.getenv("SIMILARITY_KERNEL", "numpy")  # 'numpy' | 'simsimd' | 'simsimd-i8' | 'numba'
+    EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")  # 'float32' | 'float16' (half the RAM of the existing bank)
+    SCAN_THREADS = 0                  # Threads splitting duplicate scans and reference search over large banks (0 = off)
+
     # ── Intent Evolution ────────────────────────────────────────────────
     EVOLUTION_FREQUENCY = 50          # Update weights every N questions
     EVOLUTION_STRATEGY = "adaptive"   # 'adaptive' | 'random_walk' | 'coverage_based'
@@ -81,17 +108,26 @@ class Config:
     MAX_TOKENS = 2048
     TEMPERATURE = 0.5
     MAX_RETRIES = 3                   # Retries per question on failure
+    MAX_BACKOFF = 30.0                # Cap in seconds on the retry backoff (before jitter)
+    MAX_CONCURRENCY = 4               # Max in-flight LLM calls (batches run concurrently)
+    RACE_PROVIDERS = False            # Send each call to several providers, keep the fastest (costs quota)
+    RACE_WIDTH = 2                    # Providers raced per call, in priority order (0 = all)
+    STREAM_GENERATION = True          # Stream LLM output and embed questions as they arrive
+    STREAM_EMBED_CHUNK = 8            # Streamed questions per background encode call
 
     # ── MongoDB ─────────────────────────────────────────────────────────
     USE_MONGO = os.getenv("USE_MONGO", "true").lower() == "true"
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     MONGO_DB = "questions"
     MONGO_COLLECTION = "generated_questions"
+    MONGO_FLUSH_SIZE = 1000           # Buffer this many questions per bulk write
 
     # ── Cron / Scheduler ────────────────────────────────────────────────
     CRON_INTERVAL_MINUTES = 20
     CRON_QUESTIONS_PER_RUN = 500
 
+    _dirs_ensured = False             # Output directories created (once per process)
+
     def __init__(self, **overrides):
         """Allow runtime overrides via keyword arguments."""
         for key, value in overrides.items():
@@ -101,8 +137,10 @@ class Config:
                 raise ValueError(f"Unknown config key: {key}")
 
         # Ensure output directories exist
-        self.GENERATED_BATCHES_DIR.mkdir(parents=True, exist_ok=True)
-        (self.DATA_DIR / "csv").mkdir(parents=True, exist_ok=True)
+        if not Config._dirs_ensured:
+            self.GENERATED_BATCHES_DIR.mkdir(parents=True, exist_ok=True)
+            (self.DATA_DIR / "csv").mkdir(parents=True, exist_ok=True)
+            Config._dirs_ensured = True
 
     def __repr__(self):
         attrs = {k: v for k, v in vars(type(self)).items()
@@ -0,0 +1,97 @@
+"""
+Embedding Registry — process-wide registry of loaded SentenceTransformer models.
+
+main.py and the scheduler both need the same embedding model, shared by
+SimilarityChecker and EvaluationMetrics. EmbeddingRegistry.get() loads the
+configured model once per process, warms it up, and always hands out the
+same instance, so weights are never duplicated in GPU memory.
+"""
+
+import functools
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_device() -> str:
+    """Return 'cuda' when a GPU is available, otherwise 'cpu'."""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+EMBEDDING_BACKENDS = {"torch", "onnx", "onnx-int8"}
+
+# Dynamically quantized ONNX export shipped with sentence-transformers models
+ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+@functools.cache
+def get_embedding_model(
+    name: str,
+    device: str,
+    max_seq_length: Optional[int] = None,
+    backend: str = "torch",
+):
+    """
+    Load (once) and return a SentenceTransformer model.
+
+    Args:
+        name: Model name or path.
+        device: 'cuda' or 'cpu'.
+        max_seq_length: Optional token cap. Questions are short, so a small
+            cap avoids padding every batch to the model's 512-token maximum.
+        backend: 'torch' (FP16 on CUDA), 'onnx', or 'onnx-int8' (quantized,
+            CPU). The ONNX backends need ``sentence-transformers[onnx]``.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    logger.info("Loading embedding model: %s (device=%s, backend=%s)", name, device, backend)
+    if backend == "torch":
+        model = SentenceTransformer(name, device=device)
+        if device == "cuda":
+            model.half()  # FP16 inference on GPU
+    elif backend == "onnx":
+        provider = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+        model = SentenceTransformer(
+            name, device=device, backend="onnx",
+            model_kwargs={"provider": provider},
+        )
+    else:
+        model = SentenceTransformer(
+            name, device="cpu", backend="onnx",
+            model_kwargs={"file_name": ONNX_INT8_FILE},
+        )
+
+    if max_seq_length:
+        model.max_seq_length = max_seq_length
+    return model
+
+
+class EmbeddingRegistry:
+    """Hands out the single, pre-warmed embedding model for a Config."""
+
+    _instance = None
+    _key = None
+
+    WARMUP_TEXTS = ["_warmup_"] * 8
+
+    @classmethod
+    def get(cls, config):
+        """
+        Return the shared embedding model, loading and warming it on first use.
+
+        The warm-up encode triggers CUDA kernel selection and tokenizer
+        initialisation at startup instead of during the first batch.
+        """
+        device = resolve_device()
+        key = (config.EMBEDDING_MODEL, device, config.EMBEDDING_MAX_SEQ_LENGTH, config.EMBEDDING_BACKEND)
+        if cls._instance is None or cls._key != key:
+            model = get_embedding_model(*key)
+            model.encode(cls.WARMUP_TEXTS, batch_size=len(cls.WARMUP_TEXTS), show_progress_bar=False)
+            logger.info("Embedding model warmed up on %s", device)
+            cls._instance, cls._key = model, key
+        return cls._instance
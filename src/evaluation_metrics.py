@@ -4,7 +4,7 @@ Evaluation Metrics — quality scoring for generated questions.
 
 import logging
 import numpy as np
-from collections import Counter
+from collections import Counter, OrderedDict
 from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
@@ -22,14 +22,32 @@ class EvaluationMetrics:
       - avg_intents_per_question: Mean number of intents per question
     """
 
-    def __init__(self, total_intents: int = 26, embedding_model=None):
+    # Encode sets at least this large use a multi-process pool on CPU
+    MULTI_PROCESS_MIN = 256
+
+    def __init__(
+        self,
+        total_intents: int = 26,
+        embedding_model=None,
+        cache_size: int = 10_000,
+        mongo_store=None,
+    ):
         """
         Args:
             total_intents: Number of active intents (excluding non-informational).
             embedding_model: SentenceTransformer model for diversity calculations.
+            cache_size: Max normalized question embeddings kept between reports.
+            mongo_store: Optional MongoStore for collection-wide metrics.
         """
         self.total_intents = total_intents
         self.model = embedding_model
+        self.mongo_store = mongo_store
+        self._pool = None  # multi-process encode pool, started on first large CPU encode
+
+        # LRU of normalized embeddings keyed by question text, so repeated
+        # reports only encode questions they have not seen before
+        self._embed_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_size = cache_size
 
     def calculate_metrics(
         self,
@@ -57,14 +75,41 @@ class EvaluationMetrics:
 
         total = len(generated_questions)
 
+        # One pass over the intent lists feeds all three intent metrics
+        intent_lists = [q.get("intents", []) for q in generated_questions]
+        counts_per_q = np.fromiter(map(len, intent_lists), dtype=np.int32, count=total)
+        # Count the raw ids: --intents passes names, sampling passes ints
+        intent_counts = Counter(iid for intents in intent_lists for iid, _ in intents)
+
         return {
             "total_generated": total,
             "diversity": self._semantic_diversity(generated_questions),
-            "intent_coverage": self._intent_coverage(generated_questions),
+            "intent_coverage": self._intent_coverage(intent_counts),
             "duplication_rate": rejected_duplicates / max(1, total + rejected_duplicates),
             "difficulty_distribution": self._difficulty_distribution(generated_questions),
-            "avg_intents_per_question": self._avg_intents(generated_questions),
-            "intent_distribution": self._intent_distribution(generated_questions),
+            "avg_intents_per_question": self._avg_intents(counts_per_q),
+            "intent_distribution": self._intent_distribution(intent_counts),
+        }
+
+    def calculate_stored_metrics(self) -> Dict:
+        """
+        Metrics across every question stored in MongoDB.
+
+        Computed server-side with a single $facet aggregation, so only
+        summary documents cross the network. Diversity is not included,
+        since it needs the embeddings. Returns {} without a mongo_store.
+        """
+        if self.mongo_store is None:
+            return {}
+
+        agg = self.mongo_store.aggregate_metrics()
+        intent_dist = dict(sorted(agg["intents"].items()))
+        return {
+            "total_stored": agg["total"],
+            "intent_coverage": round(len(intent_dist) / max(1, self.total_intents), 4),
+            "difficulty_distribution": agg["difficulty"],
+            "avg_intents_per_question": round(agg["avg_intents"] or 0.0, 2),
+            "intent_distribution": intent_dist,
         }
 
     # ── Individual Metrics ───────────────────────────────────────────────
@@ -80,21 +125,17 @@ class EvaluationMetrics:
 
         texts = [q["question"] for q in questions]
         try:
-            embeddings = self.model.encode(texts, show_progress_bar=False)
-            embeddings = np.array(embeddings, dtype=np.float32)
-
-            # Normalize
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            norms = np.where(norms == 0, 1.0, norms)
-            normalized = embeddings / norms
+            normalized = self._normalized_embeddings(texts)
 
-            # Pairwise cosine similarity matrix
-            sim_matrix = np.dot(normalized, normalized.T)
-
-            # Average of upper triangle (excluding diagonal)
+            # Mean pairwise cosine similarity (i < j) in closed form:
+            # sum_{i!=j} u_i.u_j = |sum_i u_i|^2 - sum_i |u_i|^2,
+            # so no N x N similarity matrix is needed
             n = len(texts)
-            upper_tri_indices = np.triu_indices(n, k=1)
-            avg_similarity = float(np.mean(sim_matrix[upper_tri_indices]))
+            # Embeddings are stored as float16; accumulate in float32
+            s = normalized.sum(axis=0, dtype=np.float32)
+            sum_sq = float(np.einsum("i,i->", s, s))
+            self_sq = float(np.einsum("ij,ij->", normalized, normalized, dtype=np.float32))
+            avg_similarity = (sum_sq - self_sq) / (n * (n - 1))
 
             # Diversity = 1 - similarity
             return round(1.0 - avg_similarity, 4)
@@ -102,13 +143,59 @@ class EvaluationMetrics:
             logger.warning("Error computing diversity: %s", e)
             return 0.0
 
-    def _intent_coverage(self, questions: List[Dict]) -> float:
+    def _normalized_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Normalized float16 embeddings for ``texts``, encoding only uncached ones.
+
+        Unit vectors lose little in half precision, and it halves the cache
+        footprint and the bytes read by the diversity reduction.
+        """
+        missing = list({t for t in texts if t not in self._embed_cache})
+        if missing:
+            # Encode in length order so each model batch pads to similar lengths
+            missing.sort(key=len)
+            if len(missing) >= self.MULTI_PROCESS_MIN and self._on_cpu():
+                # Large CPU encodes are spread over worker processes; the pool
+                # start-up cost is only worth paying for big report sets
+                if self._pool is None:
+                    self._pool = self.model.start_multi_process_pool()
+                encoded = self.model.encode_multi_process(
+                    missing, self._pool, batch_size=64, normalize_embeddings=True,
+                )
+            else:
+                encoded = self.model.encode(
+                    missing,
+                    batch_size=64,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
+                )
+            encoded = np.asarray(encoded).astype(np.float16)
+            for text, emb in zip(missing, encoded):
+                self._embed_cache[text] = emb
+
+        vectors = []
+        for text in texts:
+            self._embed_cache.move_to_end(text)
+            vectors.append(self._embed_cache[text])
+        while len(self._embed_cache) > self._cache_size:
+            self._embed_cache.popitem(last=False)
+        return np.stack(vectors)
+
+    def _on_cpu(self) -> bool:
+        """True when the embedding model runs on CPU."""
+        device = getattr(self.model, "device", None)
+        return getattr(device, "type", "cpu") == "cpu"
+
+    def close(self):
+        """Stop the multi-process encode pool, if one was started."""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def _intent_coverage(self, intent_counts: Counter) -> float:
         """Fraction of all active intents that appear at least once."""
-        used_intents = set()
-        for q in questions:
-            for intent_id, _ in q.get("intents", []):
-                used_intents.add(intent_id)
-        coverage = len(used_intents) / max(1, self.total_intents)
+        coverage = len(intent_counts) / max(1, self.total_intents)
         return round(coverage, 4)
 
     def _difficulty_distribution(self, questions: List[Dict]) -> Dict[str, int]:
@@ -116,18 +203,13 @@ class EvaluationMetrics:
         counts = Counter(q.get("difficulty", "unknown") for q in questions)
         return dict(counts)
 
-    def _avg_intents(self, questions: List[Dict]) -> float:
+    def _avg_intents(self, counts_per_q: np.ndarray) -> float:
         """Average number of intents per question."""
-        intent_counts = [len(q.get("intents", [])) for q in questions]
-        return round(np.mean(intent_counts), 2) if intent_counts else 0.0
+        return round(float(counts_per_q.mean()), 2) if counts_per_q.size else 0.0
 
-    def _intent_distribution(self, questions: List[Dict]) -> Dict[int, int]:
+    def _intent_distribution(self, intent_counts: Counter) -> Dict[int, int]:
         """Count of how many times each intent has been used."""
-        counts = Counter()
-        for q in questions:
-            for intent_id, _ in q.get("intents", []):
-                counts[intent_id] += 1
-        return dict(sorted(counts.items()))
+        return dict(sorted(intent_counts.items()))
 
     # ── Report ───────────────────────────────────────────────────────────
 
@@ -2,17 +2,28 @@
 Intent Manager — manages the 28-intent taxonomy and dynamic weight evolution.
 """
 
+import os
 import json
-import random
-import copy
 import logging
+import functools
 from collections import Counter
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=4)
+def _read_taxonomy(path: str, mtime: float) -> List[Dict]:
+    """Parse the taxonomy JSON; cached per (path, mtime) so edits are picked up."""
+    with open(path, "r", encoding="utf-8") as f:
+        intents = json.load(f)
+    logger.info("Loaded %d intents from %s", len(intents), path)
+    return intents
+
+
 class IntentManager:
     """
     Manages intent taxonomy and dynamic weight evolution.
@@ -34,30 +45,48 @@ class IntentManager:
         config=None,
     ):
         self.intents = self._load_intents(intent_taxonomy_path)
+        self._intent_by_id: Dict[int, Dict] = {i["id"]: i for i in self.intents}
         self.active_intent_ids = [
             i["id"] for i in self.intents if i["id"] not in self.EXCLUDED_INTENTS
         ]
-        self.current_weights = initial_weights or self._initialize_weights()
-        self.weight_history: List[Dict[int, float]] = []
+        self._ids_arr = np.array(self.active_intent_ids)
+        self._idx = {iid: k for k, iid in enumerate(self.active_intent_ids)}
+        self._rng = np.random.default_rng()
+        # Weights aligned with active_intent_ids (see current_weights for a dict view)
+        self._weights_arr = self._initialize_weights(initial_weights)
+        self._alias: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._build_alias()
+        self._weight_history: List[np.ndarray] = []  # one weights row per evolution
         self.generation_count = 0
-        self.generated_intent_log: List[List[Tuple[int, float]]] = []
+        self._usage_counter: Counter = Counter()  # intent_id -> times used
         self.config = config
 
     # ── Loading ──────────────────────────────────────────────────────────
 
     @staticmethod
     def _load_intents(path: str) -> List[Dict]:
-        """Load intents from JSON file."""
-        with open(path, "r", encoding="utf-8") as f:
-            intents = json.load(f)
-        logger.info("Loaded %d intents from %s", len(intents), path)
-        return intents
-
-    def _initialize_weights(self) -> Dict[int, float]:
-        """Uniform weights across active intents."""
+        """Load intents from JSON file (parsed once per file version)."""
+        return _read_taxonomy(str(path), os.path.getmtime(path))
+
+    def _initialize_weights(self, initial_weights: Optional[Dict[int, float]] = None) -> np.ndarray:
+        """Given weights if provided, otherwise uniform weights across active intents."""
         n = len(self.active_intent_ids)
-        weight = 1.0 / n
-        return {iid: weight for iid in self.active_intent_ids}
+        if initial_weights:
+            return np.array(
+                [initial_weights.get(iid, 0.0) for iid in self.active_intent_ids],
+                dtype=np.float64,
+            )
+        return np.full(n, 1.0 / n)
+
+    @property
+    def current_weights(self) -> Dict[int, float]:
+        """Current weights as an {intent_id: weight} dict."""
+        return dict(zip(self.active_intent_ids, self._weights_arr.tolist()))
+
+    @property
+    def weight_history(self) -> List[Dict[int, float]]:
+        """Weights before each evolution, as {intent_id: weight} dicts."""
+        return [dict(zip(self.active_intent_ids, row.tolist())) for row in self._weight_history]
 
     # ── Sampling ─────────────────────────────────────────────────────────
 
@@ -68,42 +97,63 @@ class IntentManager:
         Returns a list of (intent_id, normalized_weight) tuples.
         The weights within the mix are re-normalized to sum to 1.0.
         """
-        ids = list(self.current_weights.keys())
-        weights = [self.current_weights[i] for i in ids]
-
-        chosen_ids = random.choices(ids, weights=weights, k=n_intents)
-        # Avoid duplicate intents in a single mix
-        chosen_ids = list(dict.fromkeys(chosen_ids))  # preserve order, remove dupes
-        while len(chosen_ids) < n_intents:
-            extra = random.choices(ids, weights=weights, k=1)[0]
-            if extra not in chosen_ids:
-                chosen_ids.append(extra)
+        if n_intents > len(self._ids_arr):
+            raise ValueError(f"Cannot sample {n_intents} intents from {len(self._ids_arr)}")
+
+        # Weighted draws from the alias table; avoid duplicate intents in a mix
+        chosen = list(dict.fromkeys(self._draw(n_intents).tolist()))  # preserve order
+        chosen_set = set(chosen)
+        while len(chosen) < n_intents:
+            for extra in self._draw(n_intents - len(chosen)).tolist():
+                if extra not in chosen_set:
+                    chosen_set.add(extra)
+                    chosen.append(extra)
+        idx = np.array(chosen[:n_intents])
 
         # Assign proportional weights within the mix
-        raw = [self.current_weights[i] for i in chosen_ids]
-        total = sum(raw)
-        mix = [(iid, round(w / total, 3)) for iid, w in zip(chosen_ids, raw)]
-        return mix
+        raw = self._weights_arr[idx]
+        raw = raw / raw.sum()
+        return [(int(iid), round(float(w), 3)) for iid, w in zip(self._ids_arr[idx], raw)]
+
+    def _build_alias(self):
+        """Build Vose's alias table for the current weights (O(1) per draw)."""
+        n = len(self._weights_arr)
+        scaled = self._weights_arr / self._weights_arr.sum() * n
+        prob = np.ones(n)
+        alias = np.arange(n)
+
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding error
+
+        self._alias = (prob, alias)
+
+    def _draw(self, k: int) -> np.ndarray:
+        """Draw k positions (with replacement) from the alias table."""
+        prob, alias = self._alias
+        col = self._rng.integers(0, len(prob), size=k)
+        return np.where(self._rng.random(k) < prob[col], col, alias[col])
 
     # ── Intent Templates ─────────────────────────────────────────────────
 
     def get_intent_details(self, intent_ids: List[int]) -> List[Dict]:
-        """Return full intent details for the given IDs."""
-        id_set = set(intent_ids)
-        return [i for i in self.intents if i["id"] in id_set]
+        """Return full intent details for the given IDs, in the order given."""
+        return [self._intent_by_id[i] for i in intent_ids if i in self._intent_by_id]
 
     def get_intent_by_id(self, intent_id: int) -> Optional[Dict]:
         """Return a single intent by ID."""
-        for i in self.intents:
-            if i["id"] == intent_id:
-                return i
-        return None
+        return self._intent_by_id.get(intent_id)
 
     # ── Weight Evolution ─────────────────────────────────────────────────
 
     def record_generation(self, intent_mix: List[Tuple[int, float]]):
         """Record which intents were used in a generation."""
-        self.generated_intent_log.append(intent_mix)
+        self._usage_counter.update(iid for iid, _ in intent_mix)
         self.generation_count += 1
 
     def evolve_weights(self, strategy: Optional[str] = None):
@@ -116,7 +166,7 @@ class IntentManager:
           - 'coverage_based': Ensure all intents get coverage
         """
         strategy = strategy or (self.config.EVOLUTION_STRATEGY if self.config else "adaptive")
-        self.weight_history.append(copy.deepcopy(self.current_weights))
+        self._weight_history.append(self._weights_arr.copy())
 
         if strategy == "adaptive":
             self._adaptive_evolution()
@@ -130,66 +180,62 @@ class IntentManager:
         self._normalize_weights()
         self._clamp_weights()
         self._normalize_weights()
+        self._build_alias()
 
         logger.info("Weights evolved (strategy=%s). Top 5: %s",
                      strategy, self._top_k_weights(5))
 
     def _adaptive_evolution(self):
         """Increase weights for under-represented intents, decrease over-represented."""
-        usage = self._intent_usage_counts()
-        total = max(sum(usage.values()), 1)
+        usage = self._usage_array()
+        usage_ratio = usage / max(usage.sum(), 1)
+        expected_ratio = self._weights_arr
 
-        for iid in self.active_intent_ids:
-            usage_ratio = usage.get(iid, 0) / total
-            expected_ratio = self.current_weights[iid]
-
-            if usage_ratio < expected_ratio * 0.8:
-                self.current_weights[iid] *= 1.1
-            elif usage_ratio > expected_ratio * 1.2:
-                self.current_weights[iid] *= 0.95
+        under = usage_ratio < expected_ratio * 0.8
+        over = usage_ratio > expected_ratio * 1.2
+        self._weights_arr[under] *= 1.1
+        self._weights_arr[over] *= 0.95
 
     def _random_walk_evolution(self):
         """Apply small random perturbations."""
-        for iid in self.active_intent_ids:
-            perturbation = random.gauss(0, 0.02)
-            self.current_weights[iid] = max(0.01, self.current_weights[iid] + perturbation)
+        self._weights_arr += self._rng.normal(0, 0.02, size=len(self._weights_arr))
+        np.maximum(self._weights_arr, 0.01, out=self._weights_arr)
 
     def _coverage_based_evolution(self):
         """Heavily boost intents that have never been used."""
+        usage = self._usage_array()
+        self._weights_arr[usage == 0] *= 2.0
+        self._weights_arr[(usage > 0) & (usage < 3)] *= 1.3
+
+    def _usage_array(self) -> np.ndarray:
+        """Usage counts aligned with active_intent_ids."""
         usage = self._intent_usage_counts()
-        for iid in self.active_intent_ids:
-            if usage.get(iid, 0) == 0:
-                self.current_weights[iid] *= 2.0
-            elif usage.get(iid, 0) < 3:
-                self.current_weights[iid] *= 1.3
+        return np.array([usage.get(iid, 0) for iid in self.active_intent_ids], dtype=np.float64)
 
     def _intent_usage_counts(self) -> Counter:
-        """Count how many times each intent has been used."""
-        counts = Counter()
-        for mix in self.generated_intent_log:
-            for intent_id, _ in mix:
-                counts[intent_id] += 1
-        return counts
+        """Count how many times each intent has been used (maintained incrementally)."""
+        return self._usage_counter
 
     def _normalize_weights(self):
         """Normalize weights to sum to 1.0."""
-        total = sum(self.current_weights.values())
+        total = self._weights_arr.sum()
         if total > 0:
-            self.current_weights = {
-                k: v / total for k, v in self.current_weights.items()
-            }
+            self._weights_arr /= total
 
     def _clamp_weights(self):
         """Clamp weights to [MIN_WEIGHT, MAX_WEIGHT]."""
         min_w = self.config.MIN_WEIGHT if self.config else 0.05
         max_w = self.config.MAX_WEIGHT if self.config else 0.30
-        for iid in self.active_intent_ids:
-            self.current_weights[iid] = max(min_w, min(max_w, self.current_weights[iid]))
+        np.clip(self._weights_arr, min_w, max_w, out=self._weights_arr)
 
     def _top_k_weights(self, k: int = 5) -> List[Tuple[int, float]]:
         """Return top-k intents by weight."""
-        sorted_w = sorted(self.current_weights.items(), key=lambda x: x[1], reverse=True)
-        return [(iid, round(w, 4)) for iid, w in sorted_w[:k]]
+        neg = -self._weights_arr
+        k = min(k, len(neg))
+        # O(n) selection of the top k, then sort just those k
+        top = np.argpartition(neg, k - 1)[:k] if 0 < k < len(neg) else np.arange(len(neg))[:k]
+        order = top[np.argsort(neg[top], kind="stable")]
+        return [(self.active_intent_ids[i], round(float(self._weights_arr[i]), 4)) for i in order]
 
     # ── Serialization ────────────────────────────────────────────────────
 
@@ -198,6 +244,6 @@ class IntentManager:
         return {
             "generation_count": self.generation_count,
             "current_weights": {str(k): round(v, 6) for k, v in self.current_weights.items()},
-            "weight_history_length": len(self.weight_history),
+            "weight_history_length": len(self._weight_history),
             "intent_usage": dict(self._intent_usage_counts()),
         }
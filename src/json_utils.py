@@ -0,0 +1,20 @@
+"""
+JSON helpers shared by the generator and the quality verifier.
+"""
+
+import re
+
+# Whole response wrapped in a markdown fence: ```json ... ```
+_FENCE_RE = re.compile(r"^```[^\n]*\n(?:(.*?)\n)?```$", re.DOTALL)
+
+
+def extract_json(text: str) -> str:
+    """Extract JSON from potential markdown code fences."""
+    text = text.strip()
+    m = _FENCE_RE.match(text)
+    if m:
+        return (m.group(1) or "").strip()
+    if text.startswith("```"):
+        # Opening fence without a closing one (e.g. truncated output)
+        return text.partition("\n")[2].strip()
+    return text
@@ -4,12 +4,15 @@ MongoDB Store — persistence layer for generated questions.
 Connects to localhost:27017, database 'questions'.
 """
 
+import queue
 import logging
+import threading
 import uuid
-from datetime import datetime
-from typing import List, Dict, Optional
+from datetime import datetime, timezone
+from typing import Iterator, List, Dict, Optional, Tuple
 
-from pymongo import MongoClient, errors as mongo_errors
+from pymongo import MongoClient, IndexModel, InsertOne, WriteConcern, errors as mongo_errors
+from pymongo.errors import BulkWriteError
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,18 @@ class MongoStore:
     Collection: generated_questions
     """
 
+    INDEXES = [
+        IndexModel("generated_at"),
+        IndexModel("difficulty"),
+        IndexModel("provider"),
+        IndexModel("batch_id"),
+        IndexModel("cron_run_id"),
+        IndexModel([("expected_intents", 1)]),
+    ]
+
+    # (uri, db, collection) targets already indexed in this process
+    _indexed = set()
+
     def __init__(
         self,
         uri: str = "mongodb://localhost:27017",
@@ -35,7 +50,14 @@ class MongoStore:
 
         self.client = MongoClient(uri, serverSelectionTimeoutMS=5000)
         self.db = self.client[db_name]
-        self.collection = self.db[collection_name]
+        # Acknowledged writes without a journal sync per batch
+        self.collection = self.db.get_collection(
+            collection_name, write_concern=WriteConcern(w=1, j=False),
+        )
+
+        # Background writer (started on first async insert)
+        self._write_queue: "queue.Queue" = queue.Queue(maxsize=16)
+        self._writer: Optional[threading.Thread] = None
 
         # Create indexes for efficient querying
         self._ensure_indexes()
@@ -45,14 +67,13 @@ class MongoStore:
         )
 
     def _ensure_indexes(self):
-        """Create useful indexes."""
+        """Create useful indexes (one command, once per process per collection)."""
+        target = (self.uri, self.db_name, self.collection_name)
+        if target in MongoStore._indexed:
+            return
         try:
-            self.collection.create_index("generated_at")
-            self.collection.create_index("difficulty")
-            self.collection.create_index("provider")
-            self.collection.create_index("batch_id")
-            self.collection.create_index("cron_run_id")
-            self.collection.create_index([("expected_intents", 1)])
+            self.collection.create_indexes(self.INDEXES)
+            MongoStore._indexed.add(target)
         except Exception as e:
             logger.warning("Could not create indexes: %s", e)
 
@@ -76,40 +97,161 @@ class MongoStore:
             return 0
 
         batch_id = batch_id or str(uuid.uuid4())
-        now = datetime.utcnow()
-
-        docs = []
-        for q in questions:
-            doc = {
-                "question": q.get("question", ""),
-                "intents": [
-                    [int(iid), float(w)]
-                    for iid, w in q.get("intents", [])
-                ],
-                "expected_intents": q.get("expected_intents", []),
-                "difficulty": q.get("difficulty", ""),
-                "confusion_points": q.get("confusion_points", []),
-                "similarity_score": float(q.get("similarity_score", 0.0)),
-                "provider": provider or q.get("provider", "unknown"),
-                "model": model or q.get("model", "unknown"),
-                "generated_at": now,
-                "batch_id": batch_id,
-                "cron_run_id": cron_run_id or "",
-            }
-            docs.append(doc)
+        docs = self._build_docs(questions, batch_id, cron_run_id, provider, model)
 
         try:
-            result = self.collection.insert_many(docs)
+            result = self.collection.insert_many(
+                docs, ordered=False, bypass_document_validation=True,
+            )
             count = len(result.inserted_ids)
             logger.info(
                 "Inserted %d questions into MongoDB (batch_id=%s)",
                 count, batch_id[:8],
             )
             return count
+        except BulkWriteError as e:
+            count = e.details.get("nInserted", 0)
+            logger.error(
+                "MongoDB insert partially failed: %d inserted, %d errors (batch_id=%s)",
+                count, len(e.details.get("writeErrors", [])), batch_id[:8],
+            )
+            return count
         except Exception as e:
             logger.error("MongoDB insert error: %s", e)
             return 0
 
+    def flush_many(self, batches: List[Tuple[List[Dict], str]]) -> int:
+        """
+        Insert several (questions, batch_id) batches with one bulk write.
+
+        Lets callers buffer batches and pay a single round-trip per flush.
+        Returns the number of inserted documents.
+        """
+        now = datetime.now(timezone.utc)
+        requests = [
+            InsertOne(doc)
+            for questions, batch_id in batches
+            for doc in self._build_docs(questions, batch_id or str(uuid.uuid4()), now=now)
+        ]
+        if not requests:
+            return 0
+
+        try:
+            result = self.collection.bulk_write(
+                requests, ordered=False, bypass_document_validation=True,
+            )
+            logger.info(
+                "Bulk inserted %d questions into MongoDB (%d batches)",
+                result.inserted_count, len(batches),
+            )
+            return result.inserted_count
+        except BulkWriteError as e:
+            count = e.details.get("nInserted", 0)
+            logger.error(
+                "MongoDB bulk insert partially failed: %d inserted, %d errors",
+                count, len(e.details.get("writeErrors", [])),
+            )
+            return count
+        except Exception as e:
+            logger.error("MongoDB bulk insert error: %s", e)
+            return 0
+
+    # ── Background Writes ────────────────────────────────────────────────
+
+    def insert_questions_async(self, questions: List[Dict], batch_id: Optional[str] = None):
+        """Queue one batch for the background writer and return immediately."""
+        if questions:
+            self.flush_many_async([(questions, batch_id)])
+
+    def flush_many_async(self, batches: List[Tuple[List[Dict], str]]):
+        """
+        Queue (questions, batch_id) batches for the background writer.
+
+        Blocks only when the queue is full, which bounds memory if Mongo
+        falls behind generation.
+        """
+        if not batches:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._drain, name="mongo-writer", daemon=True,
+            )
+            self._writer.start()
+        self._write_queue.put(list(batches))
+
+    def wait_for_writes(self):
+        """Block until every batch queued so far has been written."""
+        if self._writer is not None:
+            self._write_queue.join()
+
+    def _drain(self):
+        """Writer loop: merge everything queued so far into one bulk write."""
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                self._write_queue.task_done()
+                return
+            batches = item
+            taken = 1
+            stop = False
+            while True:
+                try:
+                    more = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if more is None:
+                    stop = True
+                    break
+                batches.extend(more)
+            try:
+                self.flush_many(batches)
+            finally:
+                for _ in range(taken):
+                    self._write_queue.task_done()
+            if stop:
+                return
+
+    @staticmethod
+    def _build_docs(
+        questions: List[Dict],
+        batch_id: str,
+        cron_run_id: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> List[Dict]:
+        """Convert generated question dicts into MongoDB documents."""
+        # Fields identical for every document in the batch, built once
+        meta = {
+            "generated_at": now or datetime.now(timezone.utc),
+            "batch_id": batch_id,
+            "cron_run_id": cron_run_id or "",
+        }
+
+        # Questions from one batch share the same intent_mix list, so convert
+        # each distinct list once (keyed by identity) instead of per document
+        converted_intents: Dict[int, List] = {}
+
+        docs = []
+        for q in questions:
+            intents = q.get("intents", [])
+            converted = converted_intents.get(id(intents))
+            if converted is None:
+                converted = [[int(iid), float(w)] for iid, w in intents]
+                converted_intents[id(intents)] = converted
+            docs.append(meta | {
+                "question": q.get("question", ""),
+                "intents": converted,
+                "expected_intents": q.get("expected_intents", []),
+                "difficulty": q.get("difficulty", ""),
+                "confusion_points": q.get("confusion_points", []),
+                "similarity_score": float(q.get("similarity_score", 0.0)),
+                "provider": provider or q.get("provider", "unknown"),
+                "model": model or q.get("model", "unknown"),
+            })
+        return docs
+
     # ── Query ────────────────────────────────────────────────────────────
 
     def get_question_count(self) -> int:
@@ -121,7 +263,7 @@ class MongoStore:
         cursor = self.collection.find(
             {"expected_intents": intent_id},
             {"_id": 0},
-        ).sort("generated_at", -1).limit(limit)
+        ).sort("generated_at", -1).limit(limit).batch_size(min(limit, 500))
         return list(cursor)
 
     def get_questions_by_difficulty(self, difficulty: str, limit: int = 100) -> List[Dict]:
@@ -129,20 +271,33 @@ class MongoStore:
         cursor = self.collection.find(
             {"difficulty": difficulty},
             {"_id": 0},
-        ).sort("generated_at", -1).limit(limit)
+        ).sort("generated_at", -1).limit(limit).batch_size(min(limit, 500))
         return list(cursor)
 
     def get_recent_questions(self, limit: int = 50) -> List[Dict]:
         """Retrieve the most recently generated questions."""
         cursor = self.collection.find(
             {}, {"_id": 0}
-        ).sort("generated_at", -1).limit(limit)
+        ).sort("generated_at", -1).limit(limit).batch_size(min(limit, 500))
         return list(cursor)
 
+    def iter_all_questions(
+        self,
+        batch_size: int = 1000,
+        fields: Optional[Dict] = None,
+    ) -> Iterator[Dict]:
+        """
+        Stream all questions without materializing the collection.
+
+        Args:
+            batch_size: Documents fetched per server round-trip.
+            fields: Optional projection; defaults to everything except _id.
+        """
+        return self.collection.find({}, fields or {"_id": 0}).batch_size(batch_size)
+
     def get_all_questions(self) -> List[Dict]:
         """Retrieve all questions (use with caution on large collections)."""
-        cursor = self.collection.find({}, {"_id": 0})
-        return list(cursor)
+        return list(self.iter_all_questions())
 
     def get_provider_stats(self) -> Dict:
         """Get count of questions grouped by provider."""
@@ -153,6 +308,34 @@ class MongoStore:
         results = list(self.collection.aggregate(pipeline))
         return {r["_id"]: r["count"] for r in results}
 
+    def aggregate_metrics(self) -> Dict:
+        """
+        Collection-wide report metrics in one server-side $facet aggregation.
+
+        Returns:
+            {"total": int, "difficulty": {level: n}, "intents": {intent_id: n},
+             "avg_intents": float}
+        """
+        pipeline = [{"$facet": {
+            "total": [{"$count": "n"}],
+            "difficulty": [{"$group": {"_id": "$difficulty", "n": {"$sum": 1}}}],
+            "intents": [
+                {"$unwind": "$intents"},
+                {"$group": {"_id": {"$arrayElemAt": ["$intents", 0]}, "n": {"$sum": 1}}},
+            ],
+            "avg_intents": [{"$group": {
+                "_id": None,
+                "avg": {"$avg": {"$size": {"$ifNull": ["$intents", []]}}},
+            }}],
+        }}]
+        facets = next(self.collection.aggregate(pipeline), {})
+        return {
+            "total": facets["total"][0]["n"] if facets.get("total") else 0,
+            "difficulty": {r["_id"]: r["n"] for r in facets.get("difficulty", [])},
+            "intents": {r["_id"]: r["n"] for r in facets.get("intents", [])},
+            "avg_intents": facets["avg_intents"][0]["avg"] if facets.get("avg_intents") else 0.0,
+        }
+
     # ── Health ───────────────────────────────────────────────────────────
 
     def check_connection(self) -> bool:
@@ -170,5 +353,9 @@ class MongoStore:
             return False
 
     def close(self):
-        """Close the MongoDB client."""
+        """Wait for queued background writes, then close the MongoDB client."""
+        if self._writer is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
         self.client.close()
@@ -3,9 +3,10 @@ Persona Manager — Generates detailed farmer personas to contextualize question
 Acts as a separate agent (Persona Creator) in the multi-agent system.
 """
 
+import asyncio
 import logging
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from pydantic_ai import Agent
 
 from .config import Config
@@ -13,6 +14,19 @@ from .agent import _build_fallback_model
 
 logger = logging.getLogger(__name__)
 
+_PERSONA_XML = """
+<persona>
+    <name>{name}</name>
+    <age>{age}</age>
+    <region>{region}</region>
+    <farming_type>{farming_type}</farming_type>
+    <challenges>{challenges}</challenges>
+    <personality>{personality}</personality>
+    <speaking_style>{speaking_style}</speaking_style>
+    <background>{background}</background>
+</persona>
+"""
+
 
 class Persona(BaseModel):
     """Structured representation of a farmer persona."""
@@ -25,20 +39,26 @@ class Persona(BaseModel):
     speaking_style: str = Field(description="Description of how they speak (e.g., 'Broken English', 'Formal', 'Urgent')")
     background_story: str = Field(description="A brief backstory (2-3 sentences)")
 
+    # Rendered XML; a persona is reused across many batches and never edited
+    _xml: Optional[str] = PrivateAttr(default=None)
+
     def to_xml(self) -> str:
         """Convert persona to XML string for system prompt injection."""
-        return f"""
-<persona>
-    <name>{self.name}</name>
-    <age>{self.age}</age>
-    <region>{self.region}</region>
-    <farming_type>{self.farming_type}</farming_type>
-    <challenges>{', '.join(self.challenges)}</challenges>
-    <personality>{', '.join(self.personality_traits)}</personality>
-    <speaking_style>{self.speaking_style}</speaking_style>
-    <background>{self.background_story}</background>
-</persona>
-"""
+        if self._xml is None:
+            self._xml = self._render_xml()
+        return self._xml
+
+    def _render_xml(self) -> str:
+        return _PERSONA_XML.format_map({
+            "name": self.name,
+            "age": self.age,
+            "region": self.region,
+            "farming_type": self.farming_type,
+            "challenges": ", ".join(self.challenges),
+            "personality": ", ".join(self.personality_traits),
+            "speaking_style": self.speaking_style,
+            "background": self.background_story,
+        })
 
 
 class PersonaManager:
@@ -69,6 +89,10 @@ class PersonaManager:
         )
 
     def generate_persona(self, context: Optional[str] = None) -> Persona:
+        """Synchronous wrapper around :meth:`generate_persona_async`."""
+        return asyncio.run(self.generate_persona_async(context=context))
+
+    async def generate_persona_async(self, context: Optional[str] = None) -> Persona:
         """
         Generate a new persona using the agent.
         
@@ -83,8 +107,7 @@ class PersonaManager:
 
         logger.info("Generating new persona with context: %s", context or "None")
         
-        # synchronous run
-        result = self.agent.run_sync(prompt)
+        result = await self.agent.run(prompt)
         persona = result.output
         logger.info("Generated persona: %s from %s", persona.name, persona.region)
         return persona
@@ -2,12 +2,37 @@
 Prompt Builder — constructs dynamic, evolving prompts for Claude.
 """
 
+import os
 import logging
+import functools
+import itertools
+from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=4)
+def _read_prompt(path: str, mtime: float) -> str:
+    return Path(path).read_text(encoding="utf-8")
+
+
+def load_agent_prompt(path) -> str:
+    """Read the agent system prompt, re-reading only when the file changes."""
+    return _read_prompt(str(path), os.path.getmtime(path))
+
+
+@functools.lru_cache(maxsize=64)
+def _persona_block(persona_xml: str) -> str:
+    """System-prompt block for a persona, built once per distinct persona XML."""
+    return (
+        f"ADOPT THE FOLLOWING PERSONA:\n"
+        f"{persona_xml}\n\n"
+        "Speak, think, and ask questions exactly as this farmer would. "
+        "Use their vocabulary, concerns, and perspective.\n\n"
+    )
+
+
 class PromptBuilder:
     """
     Builds generation prompts that evolve over time.
@@ -43,41 +68,97 @@ class PromptBuilder:
         ],
     }
 
+    # Sections that never change between calls, built once at class load
+    LANGUAGE_GUIDELINES = "\n".join([
+        "\n## LANGUAGE & PERSPECTIVE GUIDELINES\n",
+        "Every question must sound like it comes from a real farmer — someone who is "
+        "less knowledgeable, describes problems in simple words, and needs practical help.\n",
+        "**DO use (farmer-friendly):**",
+        '- "My cotton leaves are curling and turning brown, some bugs are there, '
+        'and I also want to know about any government help for bore well"',
+        '- "When should I sell my soybean — prices are low now but I also '
+        'need to start preparing for rabi season"',
+        '- "My rice field has some white insects flying around and the '
+        'crop is not growing properly, also when is the next rain coming"',
+        "",
+        "**DO NOT use (too technical/artificial):**",
+        '- "What integrated pest management strategies exist for Spodoptera '
+        'frugiperda infestation in Zea mays during kharif season?"',
+        '- "How does the interaction between Xanthomonas oryzae and '
+        'nitrogen fertigation impact yield parameters?"',
+        '- "Kindly advise on phytosanitary measures for the management '
+        'of thrips population dynamics in Allium cepa"',
+    ])
+
+    STATIC_REQUIREMENTS = "\n".join([
+        "- All questions must be in **English**",
+        "- Questions must be realistic — something a farmer would actually ask",
+        "- Questions must be answerable by an agricultural chatbot",
+        "- Questions should test edge cases of intent classification",
+    ])
+
+    OUTPUT_FORMAT = (
+        '\n## OUTPUT FORMAT\n'
+        'Respond with a JSON array. Each element must be an object with these fields:\n'
+        '```json\n'
+        '[\n'
+        '  {\n'
+        '    "question": "The generated question text in English",\n'
+        '    "expected_intents": [<intent_id_1>, <intent_id_2>],\n'
+        '    "confusion_points": [\n'
+        '      "Brief explanation of why this is confusing for classifiers"\n'
+        '    ]\n'
+        '  }\n'
+        ']\n'
+        '```\n'
+        'Return ONLY the JSON array, no other text.'
+    )
+
+    TEMPLATE_CACHE_SIZE = 256         # Cached prompt templates (one per intent mix)
+    MAX_REFERENCES = 8                # Reference questions shown per prompt
+
+    SYSTEM_PREAMBLE = (
+        "You are an expert question designer for evaluating agricultural chatbots. "
+        "Your goal is to generate realistic, confusing, multi-intent questions that "
+        "a real farmer might ask. These questions should be challenging for intent "
+        "classification systems to categorize correctly.\n\n"
+        "CRITICAL — FARMER PERSPECTIVE:\n"
+        "- Write every question as if a small/marginal farmer is speaking to an advisor.\n"
+        "- The farmer is less knowledgeable — they describe what they SEE, not textbook terms.\n"
+        "- NEVER use scientific names, complex agricultural jargon, or technical terminology.\n"
+        "- Use simple, everyday language: 'my leaves are turning yellow', 'bugs on my crop', "
+        "'when to put fertilizer', 'is there any scheme for bore well'.\n"
+        "- Questions must be grounded in real situations — real worries about crops, weather, "
+        "money, schemes, pests, water, and market prices.\n\n"
+    )
+
     def __init__(self, agent_system_prompt: str, config=None):
         self.agent_prompt = agent_system_prompt
         self.config = config
         self.version = 1
 
-    def build_system_prompt(self, persona: Optional[object] = None) -> str:
-        """Build the system-level prompt for the LLM."""
-        base_prompt = (
-            "You are an expert question designer for evaluating agricultural chatbots. "
-            "Your goal is to generate realistic, confusing, multi-intent questions that "
-            "a real farmer might ask. These questions should be challenging for intent "
-            "classification systems to categorize correctly.\n\n"
-            "CRITICAL — FARMER PERSPECTIVE:\n"
-            "- Write every question as if a small/marginal farmer is speaking to an advisor.\n"
-            "- The farmer is less knowledgeable — they describe what they SEE, not textbook terms.\n"
-            "- NEVER use scientific names, complex agricultural jargon, or technical terminology.\n"
-            "- Use simple, everyday language: 'my leaves are turning yellow', 'bugs on my crop', "
-            "'when to put fertilizer', 'is there any scheme for bore well'.\n"
-            "- Questions must be grounded in real situations — real worries about crops, weather, "
-            "money, schemes, pests, water, and market prices.\n\n"
-        )
-        
-        if persona:
-            base_prompt += (
-                f"ADOPT THE FOLLOWING PERSONA:\n"
-                f"{persona.to_xml()}\n\n"
-                "Speak, think, and ask questions exactly as this farmer would. "
-                "Use their vocabulary, concerns, and perspective.\n\n"
-            )
-            
-        return base_prompt + (
+        # Agent capabilities are fixed per builder; only the persona varies
+        self._system_tail = (
             "The chatbot you are testing has the following capabilities:\n"
-            f"{self.agent_prompt}\n\n"
+            f"{agent_system_prompt}\n\n"
             "IMPORTANT: Generate all questions in ENGLISH only."
         )
+        self._base_system_prompt = self.SYSTEM_PREAMBLE + self._system_tail
+
+        # intent_id -> pre-rendered detail lines (taxonomy is fixed per run)
+        self._intent_text: Dict[int, str] = {}
+
+        # difficulty -> bullet list of techniques (rebuilt when techniques evolve)
+        self._techniques_text = self._compile_techniques()
+
+        # (intent_mix, difficulty, batch_size) -> (head, middle, tail) of the prompt
+        self._template_cache: Dict[tuple, Tuple[str, str, str]] = {}
+
+    def build_system_prompt(self, persona: Optional[object] = None) -> str:
+        """Build the system-level prompt for the LLM."""
+        if persona:
+            return self.SYSTEM_PREAMBLE + _persona_block(persona.to_xml()) + self._system_tail
+        return self._base_system_prompt
 
     def build_generation_prompt(
         self,
@@ -99,106 +180,116 @@ class PromptBuilder:
             generation_count: Total questions generated so far
             batch_size: Number of questions to generate in this call
         """
-        sections = []
-
-        # ── Section 1: Intent Mix Target ─────────────────────────────────
-        sections.append("## TARGET INTENT MIX\n")
-        sections.append(
-            "Generate questions that blend the following intents. "
-            "Each question should genuinely confuse an intent classifier "
-            "about which category it belongs to.\n"
-        )
-        for (intent_id, weight), details in zip(intent_mix, intent_details):
-            sections.append(
-                f"- **Intent {intent_id}: {details['name']}** (weight: {weight})\n"
-                f"  Primary intent: {details['primary_intent']}\n"
-                f"  Key signals: {', '.join(details['key_signals'])}\n"
-                f"  Description: {details['description']}\n"
-            )
+        # ── Sections 1, 3, 4, 6: fixed for a given mix, cached ───────────
+        head, middle, tail = self._template(intent_mix, intent_details, difficulty, batch_size)
 
         # ── Section 2: Reference Questions ───────────────────────────────
+        ref_section = ""
         if similar_questions:
-            sections.append("\n## REFERENCE QUESTIONS (DO NOT DUPLICATE)\n")
-            sections.append(
+            ref_block = "\n".join(
+                f"  {i}. {q} (similarity: {score:.2f})"
+                for i, (q, score) in enumerate(
+                    itertools.islice(similar_questions, self.MAX_REFERENCES), 1,
+                )
+            )
+            ref_section = (
+                "\n\n## REFERENCE QUESTIONS (DO NOT DUPLICATE)\n\n"
                 "These are existing questions in the database. Use them as stylistic "
-                "reference but DO NOT copy or closely paraphrase them:\n"
+                "reference but DO NOT copy or closely paraphrase them:\n\n"
+                f"{ref_block}"
             )
-            for i, (q, score) in enumerate(similar_questions[:8], 1):
-                sections.append(f"  {i}. {q} (similarity: {score:.2f})")
+
+        # ── Section 5: Diversity Guidance ────────────────────────────────
+        diversity_section = ""
+        if generation_count > 20:
+            diversity_section = (
+                f"\n\n## DIVERSITY NOTE\n"
+                f"You have already generated {generation_count} questions. "
+                f"Ensure these questions explore NEW angles, crop types, locations, "
+                f"and phrasings. Avoid repeating patterns from earlier generations."
+            )
+
+        return f"{head}{ref_section}{middle}{diversity_section}{tail}"
+
+    def _template(
+        self,
+        intent_mix: List[Tuple[int, float]],
+        intent_details: List[Dict],
+        difficulty: str,
+        batch_size: int,
+    ) -> Tuple[str, str, str]:
+        """
+        The parts of a generation prompt that only depend on the intent mix,
+        difficulty and batch size, split around the reference-question and
+        diversity slots. Cached, since fixed ``target_intents`` repeat them
+        for every batch.
+        """
+        key = (tuple(intent_mix), difficulty, batch_size)
+        parts = self._template_cache.get(key)
+        if parts is not None:
+            return parts
+
+        # ── Section 1: Intent Mix Target ─────────────────────────────────
+        intent_block = "\n".join(
+            f"- **Intent {intent_id}: {details['name']}** (weight: {weight})\n"
+            + self._render_intent(intent_id, details)
+            for (intent_id, weight), details in zip(intent_mix, intent_details)
+        )
 
         # ── Section 3: Generation Requirements ───────────────────────────
-        intent_names = [d["name"] for d in intent_details]
-        n_intents = len(intent_mix)
+        intent_names = ", ".join(d["name"] for d in intent_details)
         weight_desc = ", ".join(
             f"{d['name']}={w}" for (_, w), d in zip(intent_mix, intent_details)
         )
 
-        sections.append(f"\n## GENERATION REQUIREMENTS\n")
-        sections.append(f"- Generate exactly **{batch_size}** questions")
-        sections.append(f"- Each question must blend {n_intents} intents: {', '.join(intent_names)}")
-        sections.append(f"- Intent weight distribution: {weight_desc}")
-        sections.append(f"- Difficulty level: **{difficulty.upper()}**")
-        sections.append("- All questions must be in **English**")
-        sections.append("- Questions must be realistic — something a farmer would actually ask")
-        sections.append("- Questions must be answerable by an agricultural chatbot")
-        sections.append("- Questions should test edge cases of intent classification")
-
-        # ── Section: Language & Perspective Guidelines ────────────────────
-        sections.append("\n## LANGUAGE & PERSPECTIVE GUIDELINES\n")
-        sections.append(
-            "Every question must sound like it comes from a real farmer — someone who is "
-            "less knowledgeable, describes problems in simple words, and needs practical help.\n"
+        # ── Section 4: Confusion Techniques ──────────────────────────────
+        tech_block = self._techniques_text.get(difficulty, self._techniques_text["hard"])
+
+        # ── Assemble (Section 6: Output Format) ──────────────────────────
+        head = (
+            "## TARGET INTENT MIX\n\n"
+            "Generate questions that blend the following intents. "
+            "Each question should genuinely confuse an intent classifier "
+            "about which category it belongs to.\n\n"
+            f"{intent_block}"
         )
-        sections.append("**DO use (farmer-friendly):**")
-        sections.append('- "My cotton leaves are curling and turning brown, some bugs are there, '
-                        'and I also want to know about any government help for bore well"')
-        sections.append('- "When should I sell my soybean — prices are low now but I also '
-                        'need to start preparing for rabi season"')
-        sections.append('- "My rice field has some white insects flying around and the '
-                        'crop is not growing properly, also when is the next rain coming"')
-        sections.append("")
-        sections.append("**DO NOT use (too technical/artificial):**")
-        sections.append('- "What integrated pest management strategies exist for Spodoptera '
-                        'frugiperda infestation in Zea mays during kharif season?"')
-        sections.append('- "How does the interaction between Xanthomonas oryzae and '
-                        'nitrogen fertigation impact yield parameters?"')
-        sections.append('- "Kindly advise on phytosanitary measures for the management '
-                        'of thrips population dynamics in Allium cepa"')
+        middle = (
+            "\n\n## GENERATION REQUIREMENTS\n\n"
+            f"- Generate exactly **{batch_size}** questions\n"
+            f"- Each question must blend {len(intent_mix)} intents: {intent_names}\n"
+            f"- Intent weight distribution: {weight_desc}\n"
+            f"- Difficulty level: **{difficulty.upper()}**\n"
+            f"{self.STATIC_REQUIREMENTS}\n"
+            f"{self.LANGUAGE_GUIDELINES}\n"
+            f"\n## CONFUSION TECHNIQUES TO USE (Difficulty: {difficulty})\n\n"
+            f"{tech_block}"
+        )
+        tail = f"\n{self.OUTPUT_FORMAT}"
 
-        # ── Section 4: Confusion Techniques ──────────────────────────────
-        techniques = self.CONFUSION_TECHNIQUES.get(difficulty, self.CONFUSION_TECHNIQUES["hard"])
-        sections.append(f"\n## CONFUSION TECHNIQUES TO USE (Difficulty: {difficulty})\n")
-        for t in techniques:
-            sections.append(f"- {t}")
+        if len(self._template_cache) >= self.TEMPLATE_CACHE_SIZE:
+            self._template_cache.pop(next(iter(self._template_cache)))  # oldest first
+        parts = self._template_cache[key] = (head, middle, tail)
+        return parts
 
-        # ── Section 5: Diversity Guidance ────────────────────────────────
-        if generation_count > 20:
-            sections.append(
-                f"\n## DIVERSITY NOTE\n"
-                f"You have already generated {generation_count} questions. "
-                f"Ensure these questions explore NEW angles, crop types, locations, "
-                f"and phrasings. Avoid repeating patterns from earlier generations."
+    def _render_intent(self, intent_id: int, details: Dict) -> str:
+        """Weight-independent lines of an intent's entry, rendered once per intent."""
+        text = self._intent_text.get(intent_id)
+        if text is None:
+            text = (
+                f"  Primary intent: {details['primary_intent']}\n"
+                f"  Key signals: {', '.join(details['key_signals'])}\n"
+                f"  Description: {details['description']}\n"
             )
+            self._intent_text[intent_id] = text
+        return text
 
-        # ── Section 6: Output Format ─────────────────────────────────────
-        sections.append(
-            '\n## OUTPUT FORMAT\n'
-            'Respond with a JSON array. Each element must be an object with these fields:\n'
-            '```json\n'
-            '[\n'
-            '  {\n'
-            '    "question": "The generated question text in English",\n'
-            '    "expected_intents": [<intent_id_1>, <intent_id_2>],\n'
-            '    "confusion_points": [\n'
-            '      "Brief explanation of why this is confusing for classifiers"\n'
-            '    ]\n'
-            '  }\n'
-            ']\n'
-            '```\n'
-            'Return ONLY the JSON array, no other text.'
-        )
-
-        return "\n".join(sections)
+    @classmethod
+    def _compile_techniques(cls) -> Dict[str, str]:
+        """Render each difficulty's confusion techniques as a bullet list."""
+        return {
+            difficulty: "\n".join(f"- {t}" for t in techniques)
+            for difficulty, techniques in cls.CONFUSION_TECHNIQUES.items()
+        }
 
     def evolve_prompt_template(self, feedback_metrics: Optional[Dict] = None):
         """
@@ -214,5 +305,7 @@ class PromptBuilder:
                 self.CONFUSION_TECHNIQUES["hard"].append(
                     "Use completely different crops, locations, and scenarios than previous questions"
                 )
+                self._techniques_text = self._compile_techniques()
+                self._template_cache.clear()
             if feedback_metrics.get("duplication_rate", 0) > 0.1:
                 logger.info("High duplication — strengthening uniqueness constraints (v%d)", self.version)
@@ -6,16 +6,35 @@ unnatural, or use overly technical/scientific language. Ensures questions
 sound like they come from a real farmer.
 """
 
-import json
+import re
+import asyncio
 import logging
 from typing import List, Dict, Optional
 
+import orjson
 from pydantic_ai import Agent
 
 from .config import Config
+from .json_utils import extract_json
 
 logger = logging.getLogger(__name__)
 
+# Phrases the rejection criteria below name explicitly; a question using any
+# of them is rejected without asking the LLM.
+_JARGON_RE = re.compile(
+    r"\b(kindly advise|please elaborate|elaborate on|what strategies|"
+    r"integrated pest management|phytosanitary|fertigation|yield parameters|"
+    r"population dynamics)\b",
+    re.IGNORECASE,
+)
+
+
+def jargon_match(text: str) -> Optional[str]:
+    """Return the phrase that makes ``text`` an automatic reject, if any."""
+    match = _JARGON_RE.search(text)
+    return match.group(0) if match else None
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Verification Prompt
 # ═══════════════════════════════════════════════════════════════════════════
@@ -58,16 +77,15 @@ questions should pass through.
 
 ## OUTPUT FORMAT
 
-Respond with a JSON object:
+Questions are numbered. Respond with a JSON object listing ONLY the rejected ones
+by number; every question not listed is accepted:
 {
-  "accepted": [
-    {"question": "...", "expected_intents": [...], "confusion_points": [...]}
-  ],
   "rejected": [
-    {"question": "...", "reason": "Brief explanation of why rejected"}
+    {"index": <question number>, "reason": "Brief explanation of why rejected"}
   ]
 }
 
+Use an empty "rejected" list if every question passes.
 Return ONLY the JSON object, no other text."""
 
 
@@ -92,11 +110,20 @@ class QualityVerifier:
         self.config = config
         self._total_reviewed = 0
         self._total_rejected = 0
+        self._total_prefiltered = 0
 
     def verify_batch(
         self,
         questions: List[Dict],
         deps: object,
+    ) -> List[Dict]:
+        """Synchronous wrapper around :meth:`verify_batch_async`."""
+        return asyncio.run(self.verify_batch_async(questions, deps))
+
+    async def verify_batch_async(
+        self,
+        questions: List[Dict],
+        deps: object,
     ) -> List[Dict]:
         """
         Review a batch of questions and return only those that pass quality checks.
@@ -112,50 +139,48 @@ class QualityVerifier:
         if not questions:
             return []
 
-        # Build the review prompt with the questions to verify
-        questions_for_review = []
-        for q in questions:
-            questions_for_review.append({
-                "question": q["question"],
-                "expected_intents": q.get("expected_intents", []),
-                "confusion_points": q.get("confusion_points", []),
-            })
+        # Reject questions with known jargon/formal phrasing up front
+        questions = [q for q in questions if not self.prefilter(q["question"])]
+        if not questions:
+            return []
 
+        # Build the review prompt: question text only, one numbered line each
+        numbered = "\n".join(
+            f"{i}. {' '.join(q['question'].split())}" for i, q in enumerate(questions, 1)
+        )
         review_prompt = (
             f"{VERIFIER_SYSTEM_PROMPT}\n\n"
             f"## QUESTIONS TO REVIEW\n\n"
-            f"Review the following {len(questions_for_review)} questions and "
-            f"categorize each as accepted or rejected:\n\n"
-            f"```json\n{json.dumps(questions_for_review, indent=2, ensure_ascii=False)}\n```"
+            f"Review the following {len(questions)} questions and "
+            f"list the ones to reject:\n\n"
+            f"{numbered}"
         )
 
         try:
-            result = self.agent.run_sync(review_prompt, deps=deps)
+            result = await self.agent.run(review_prompt, deps=deps)
             raw_text = result.output
             if not isinstance(raw_text, str):
                 raw_text = str(raw_text)
 
             # Extract JSON from potential markdown fences
-            content = self._extract_json(raw_text)
-            review_result = json.loads(content)
-
-            # Extract accepted questions
-            accepted_texts = set()
-            if isinstance(review_result, dict) and "accepted" in review_result:
-                for item in review_result["accepted"]:
-                    if isinstance(item, dict) and "question" in item:
-                        accepted_texts.add(item["question"].strip())
-
-                # Log rejected questions
-                rejected = review_result.get("rejected", [])
-                for item in rejected:
-                    if isinstance(item, dict):
+            content = extract_json(raw_text)
+            review_result = orjson.loads(content)
+
+            # Collect rejected question numbers (1-based in the prompt)
+            if isinstance(review_result, dict) and isinstance(review_result.get("rejected"), list):
+                rejected_indices = set()
+                for item in review_result["rejected"]:
+                    if not isinstance(item, dict):
+                        continue
+                    index = item.get("index")
+                    if isinstance(index, int) and 1 <= index <= len(questions):
+                        rejected_indices.add(index - 1)
                         logger.info(
                             "Quality rejected: '%s' — Reason: %s",
-                            item.get("question", "?")[:80],
+                            questions[index - 1]["question"][:80],
                             item.get("reason", "unknown"),
                         )
-                self._total_rejected += len(rejected)
+                self._total_rejected += len(rejected_indices)
             else:
                 # If the response doesn't have expected structure, accept all
                 logger.warning(
@@ -164,11 +189,8 @@ class QualityVerifier:
                 self._total_reviewed += len(questions)
                 return questions
 
-            # Filter original questions to preserve full metadata
-            verified = []
-            for q in questions:
-                if q["question"].strip() in accepted_texts:
-                    verified.append(q)
+            # Keep the original dicts to preserve full metadata
+            verified = [q for i, q in enumerate(questions) if i not in rejected_indices]
 
             self._total_reviewed += len(questions)
             logger.info(
@@ -178,7 +200,7 @@ class QualityVerifier:
 
             return verified
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.warning("Verifier JSON parse error: %s — accepting all questions", e)
             self._total_reviewed += len(questions)
             return questions
@@ -187,17 +209,16 @@ class QualityVerifier:
             self._total_reviewed += len(questions)
             return questions
 
-    @staticmethod
-    def _extract_json(text: str) -> str:
-        """Extract JSON from potential markdown code fences."""
-        text = text.strip()
-        if text.startswith("```"):
-            lines = text.split("\n")
-            lines = lines[1:]  # Remove opening fence
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]  # Remove closing fence
-            text = "\n".join(lines)
-        return text.strip()
+    def prefilter(self, text: str) -> bool:
+        """Reject ``text`` without an LLM call if it uses known jargon; True if rejected."""
+        phrase = jargon_match(text)
+        if phrase is None:
+            return False
+        logger.info("Quality pre-filter rejected: '%s' — matched '%s'", text[:80], phrase)
+        self._total_prefiltered += 1
+        self._total_rejected += 1
+        self._total_reviewed += 1
+        return True
 
     @property
     def stats(self) -> Dict:
@@ -205,6 +226,7 @@ class QualityVerifier:
         return {
             "total_reviewed": self._total_reviewed,
             "total_rejected": self._total_rejected,
+            "total_prefiltered": self._total_prefiltered,
             "rejection_rate": (
                 self._total_rejected / max(1, self._total_reviewed)
             ),
@@ -2,24 +2,78 @@
 Question Generator — core generation logic using pydantic-ai Agent.
 """
 
-import json
-import time
 import random
+import asyncio
 import logging
 from typing import List, Dict, Tuple, Optional
 
+import orjson
 from pydantic_ai import Agent
 
 from .intent_manager import IntentManager
 from .similarity_checker import SimilarityChecker
 from .prompt_builder import PromptBuilder
-from .quality_verifier import QualityVerifier
+from .quality_verifier import QualityVerifier, jargon_match
 from .agent import PipelineDeps
 from .config import Config
+from .json_utils import extract_json
 
 logger = logging.getLogger(__name__)
 
 
+class _JsonArrayStream:
+    """
+    Incrementally pulls complete objects out of a streamed JSON array.
+
+    Text before the first '[' (e.g. a markdown fence) is ignored. Objects
+    that fail to parse are skipped; the full response is still parsed
+    normally once the stream ends.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Append streamed text and return any objects completed by it."""
+        self._text += chunk
+        objects = []
+        for i in range(self._pos, len(self._text)):
+            c = self._text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"' and self._depth > 0:
+                self._in_string = True
+            elif c in "[{":
+                self._depth += 1
+                if c == "{" and self._depth == 2:
+                    self._start = i
+            elif c in "]}" and self._depth > 0:
+                self._depth -= 1
+                if c == "}" and self._depth == 1 and self._start is not None:
+                    try:
+                        objects.append(orjson.loads(self._text[self._start:i + 1]))
+                    except orjson.JSONDecodeError:
+                        pass
+                    self._start = None
+        self._pos = len(self._text)
+        return objects
+
+    @property
+    def text(self) -> str:
+        """All text streamed so far."""
+        return self._text
+
+
 class QuestionGenerator:
     """
     Generates multi-intent confusing questions using a pydantic-ai Agent.
@@ -56,6 +110,13 @@ class QuestionGenerator:
         self._last_provider = None
         self._last_model = None
 
+        # Caps in-flight LLM calls; created lazily per event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+        # tuple(intent_ids) -> representative query (intent mixes recur)
+        self._query_cache: Dict[tuple, str] = {}
+
     # ── Batch Generation ─────────────────────────────────────────────────
 
     def generate_batch(
@@ -65,19 +126,85 @@ class QuestionGenerator:
         intent_mix_size: int = 3,
         persona: Optional[object] = None,
         target_intents: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """Synchronous wrapper around :meth:`generate_batch_async`."""
+        return asyncio.run(self.generate_batch_async(
+            batch_size=batch_size,
+            difficulty=difficulty,
+            intent_mix_size=intent_mix_size,
+            persona=persona,
+            target_intents=target_intents,
+        ))
+
+    async def generate_batch_async(
+        self,
+        batch_size: int = 10,
+        difficulty: str = "hard",
+        intent_mix_size: int = 3,
+        persona: Optional[object] = None,
+        target_intents: Optional[List[str]] = None,
     ) -> List[Dict]:
         """
         Generate a batch of multi-intent confusing questions.
 
+        Several batches can be awaited together with ``asyncio.gather``;
+        the number of concurrent LLM calls is capped by MAX_CONCURRENCY.
+
         Returns a list of question dicts with provider metadata.
         """
-        logger.info(
-            "Generating batch: size=%d, difficulty=%s, mix_size=%d%s",
-            batch_size, difficulty, intent_mix_size,
-            f", fixed_intents={target_intents}" if target_intents else "",
+        batches = await self.generate_batches_async([{
+            "batch_size": batch_size,
+            "difficulty": difficulty,
+            "intent_mix_size": intent_mix_size,
+            "persona": persona,
+            "target_intents": target_intents,
+        }])
+        return batches[0]
+
+    def generate_batches(self, specs: List[Dict]) -> List[List[Dict]]:
+        """Synchronous wrapper around :meth:`generate_batches_async`."""
+        return asyncio.run(self.generate_batches_async(specs))
+
+    async def generate_batches_async(
+        self,
+        specs: List[Dict],
+        return_exceptions: bool = False,
+    ) -> List[List[Dict]]:
+        """
+        Generate several batches concurrently.
+
+        Each spec holds generate_batch_async keyword arguments. Reference
+        questions for every batch are retrieved up front with a single
+        batched embedding call and similarity search.
+
+        Returns one question list per spec; with ``return_exceptions`` a
+        failed batch yields its exception instead (as in asyncio.gather).
+        """
+        # 1. Determine intent mixes
+        mixes = [
+            self._resolve_intent_mix(spec.get("intent_mix_size", 3), spec.get("target_intents"))
+            for spec in specs
+        ]
+
+        # 2. Build representative queries and search for all of them at once
+        queries = [self._representative_query(mix, details) for mix, details in mixes]
+        neighbours = self.similarity_checker.find_similar_questions_batch(queries, top_k=5)
+
+        return await asyncio.gather(
+            *(
+                self._generate_prepared(spec, intent_mix, intent_details, similar)
+                for spec, (intent_mix, intent_details), similar
+                in zip(specs, mixes, neighbours)
+            ),
+            return_exceptions=return_exceptions,
         )
 
-        # 1. Determine intent mix
+    def _resolve_intent_mix(
+        self,
+        intent_mix_size: int,
+        target_intents: Optional[List[str]],
+    ) -> Tuple[List[Tuple[int, float]], List[Dict]]:
+        """Return (intent_mix, intent_details) for one batch."""
         if target_intents:
             # Use fixed intents if provided (override sampling)
             intent_ids = target_intents
@@ -88,13 +215,26 @@ class QuestionGenerator:
             # Sample random mix
             intent_mix = self.intent_manager.sample_intent_mix(n_intents=intent_mix_size)
             intent_ids = [iid for iid, _ in intent_mix]
-        
-        intent_details = self.intent_manager.get_intent_details(intent_ids)
 
-        # 2. Build a representative query for similarity search
-        representative_query = self._build_representative_query(intent_details)
-        similar_questions = self.similarity_checker.find_similar_questions(
-            representative_query, top_k=5
+        return intent_mix, self.intent_manager.get_intent_details(intent_ids)
+
+    async def _generate_prepared(
+        self,
+        spec: Dict,
+        intent_mix: List[Tuple[int, float]],
+        intent_details: List[Dict],
+        similar_questions: List[Tuple[str, float]],
+    ) -> List[Dict]:
+        """Generate one batch once its intents and references are known."""
+        batch_size = spec.get("batch_size", 10)
+        difficulty = spec.get("difficulty", "hard")
+        persona = spec.get("persona")
+        target_intents = spec.get("target_intents")
+
+        logger.info(
+            "Generating batch: size=%d, difficulty=%s, mix_size=%d%s",
+            batch_size, difficulty, len(intent_mix),
+            f", fixed_intents={target_intents}" if target_intents else "",
         )
 
         # 3. Build prompt
@@ -108,7 +248,7 @@ class QuestionGenerator:
         )
 
         # 4. Call LLM via pydantic-ai Agent (handles fallback across providers)
-        raw_questions = self._call_llm(generation_prompt, persona=persona)
+        raw_questions = await self._call_llm(generation_prompt, persona=persona)
 
         # 5. Validate and deduplicate
         validated = self._validate_and_deduplicate(raw_questions, intent_mix, difficulty)
@@ -116,7 +256,7 @@ class QuestionGenerator:
         # 6. Quality verification — remove artificial/unnatural questions
         if self.quality_verifier and validated:
             pre_verify_count = len(validated)
-            validated = self.quality_verifier.verify_batch(validated, self.deps)
+            validated = await self.quality_verifier.verify_batch_async(validated, self.deps)
             self._total_rejected_quality += (pre_verify_count - len(validated))
 
         # 7. Record intents used
@@ -135,33 +275,44 @@ class QuestionGenerator:
 
     # ── LLM Call ─────────────────────────────────────────────────────────
 
-    def _call_llm(self, prompt: str, persona: Optional[object] = None) -> List[Dict]:
+    def _llm_semaphore(self) -> asyncio.Semaphore:
+        """Return the concurrency semaphore bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(max(1, self.config.MAX_CONCURRENCY))
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _call_llm(self, prompt: str, persona: Optional[object] = None) -> List[Dict]:
         """Call LLM via pydantic-ai Agent and parse the JSON response."""
         system_prompt = self.prompt_builder.build_system_prompt(persona=persona)
 
         for attempt in range(1, self.config.MAX_RETRIES + 1):
             try:
                 # Use the agent for the LLM call
-                result = self.agent.run_sync(
-                    f"{system_prompt}\n\n{prompt}",
-                    deps=self.deps,
-                )
+                async with self._llm_semaphore():
+                    if self.config.STREAM_GENERATION and isinstance(self.agent, Agent):
+                        raw_text, messages = await self._stream_llm(f"{system_prompt}\n\n{prompt}")
+                    else:
+                        result = await self.agent.run(
+                            f"{system_prompt}\n\n{prompt}",
+                            deps=self.deps,
+                        )
+                        raw_text, messages = result.output, result.all_messages()
 
-                raw_text = result.output
                 if not isinstance(raw_text, str):
                     raw_text = str(raw_text)
 
                 # Extract provider/model info from the result
-                if hasattr(result, 'all_messages') and result.all_messages():
-                    for msg in result.all_messages():
-                        if hasattr(msg, 'model_name') and msg.model_name:
-                            parts = msg.model_name.split("/", 1)
-                            self._last_provider = parts[0] if len(parts) > 1 else "unknown"
-                            self._last_model = parts[-1]
-                            break
+                for msg in messages or []:
+                    if hasattr(msg, 'model_name') and msg.model_name:
+                        parts = msg.model_name.split("/", 1)
+                        self._last_provider = parts[0] if len(parts) > 1 else "unknown"
+                        self._last_model = parts[-1]
+                        break
 
-                content = self._extract_json(raw_text)
-                questions = json.loads(content)
+                content = extract_json(raw_text)
+                questions = orjson.loads(content)
 
                 if isinstance(questions, list):
                     logger.info(
@@ -176,31 +327,68 @@ class QuestionGenerator:
                         attempt, self._last_provider,
                     )
 
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 logger.warning("JSON parse error on attempt %d: %s", attempt, e)
             except RuntimeError as e:
                 logger.error("Agent error on attempt %d: %s", attempt, e, exc_info=True)
                 if attempt < self.config.MAX_RETRIES:
-                    time.sleep(5)
+                    await asyncio.sleep(self._retry_delay(5.0))
             except Exception as e:
                 logger.error("Unexpected error on attempt %d: %s", attempt, e, exc_info=True)
                 if attempt < self.config.MAX_RETRIES:
-                    time.sleep(2 ** attempt)
+                    await asyncio.sleep(self._retry_delay(2 ** attempt))
 
         logger.error("All %d attempts failed. Returning empty batch.", self.config.MAX_RETRIES)
         return []
 
-    @staticmethod
-    def _extract_json(text: str) -> str:
-        """Extract JSON from potential markdown code fences."""
-        text = text.strip()
-        if text.startswith("```"):
-            lines = text.split("\n")
-            lines = lines[1:]  # Remove opening fence
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]  # Remove closing fence
-            text = "\n".join(lines)
-        return text.strip()
+    def _retry_delay(self, base: float) -> float:
+        """
+        Jittered retry delay, capped at MAX_BACKOFF.
+
+        Concurrent batches that fail together (e.g. a provider outage) then
+        retry at different times instead of all at once.
+        """
+        return random.uniform(0.5, 1.5) * min(base, self.config.MAX_BACKOFF)
+
+    async def _stream_llm(self, full_prompt: str) -> Tuple[str, list]:
+        """
+        Stream the agent's response, embedding questions as they complete.
+
+        Each STREAM_EMBED_CHUNK parsed questions are encoded in a background
+        thread while the rest of the response is still arriving, so the
+        duplicate check afterwards mostly hits the embedding cache.
+
+        Returns (raw_text, messages).
+        """
+        parser = _JsonArrayStream()
+        pending: List[str] = []
+        prefetches = []
+        chunk_size = max(1, self.config.STREAM_EMBED_CHUNK)
+
+        async with self.agent.run_stream(full_prompt, deps=self.deps) as result:
+            async for delta in result.stream_text(delta=True):
+                for q in parser.feed(delta):
+                    if isinstance(q, dict) and isinstance(q.get("question"), str):
+                        text = q["question"].strip()
+                        # Questions the verifier pre-filter will drop are never embedded
+                        if not (self.quality_verifier and jargon_match(text)):
+                            pending.append(text)
+                if len(pending) >= chunk_size:
+                    prefetches.append(asyncio.create_task(
+                        self.similarity_checker.prefetch_embeddings(pending)
+                    ))
+                    pending = []
+            raw_text = parser.text
+            messages = result.all_messages()
+
+        if pending:
+            prefetches.append(asyncio.create_task(
+                self.similarity_checker.prefetch_embeddings(pending)
+            ))
+        for outcome in await asyncio.gather(*prefetches, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.warning("Embedding prefetch failed: %s", outcome)
+        return raw_text, messages
 
     # ── Validation ───────────────────────────────────────────────────────
 
@@ -211,8 +399,8 @@ class QuestionGenerator:
         difficulty: str,
     ) -> List[Dict]:
         """Validate structure and check for duplicates."""
-        validated = []
-
+        candidates = []
+        seen = set()
         for q in raw_questions:
             if not isinstance(q, dict) or "question" not in q:
                 logger.debug("Skipping malformed question: %s", q)
@@ -223,22 +411,46 @@ class QuestionGenerator:
                 logger.debug("Skipping too-short question: %s", question_text)
                 continue
 
-            # Duplicate check
-            is_dup, max_sim = self.similarity_checker.is_duplicate(question_text)
+            # Cheap phrasing check first, so rejected questions are never embedded
+            if self.quality_verifier and self.quality_verifier.prefilter(question_text):
+                self._total_rejected_quality += 1
+                continue
+
+            # Exact repeats (ignoring case/whitespace) never need an embedding
+            normalized = " ".join(question_text.lower().split())
+            if normalized in seen:
+                self._total_rejected_duplicates += 1
+                logger.debug("Rejected repeat within batch: %s", question_text[:60])
+                continue
+            seen.add(normalized)
+
+            candidates.append((q, question_text))
+
+        if not candidates:
+            return []
+
+        # Duplicate check — one batched encode + matrix product for all candidates
+        texts = [text for _, text in candidates]
+        embeddings = self.similarity_checker.encode_many(texts)
+        checks = self.similarity_checker.is_duplicate_batch(texts, embeddings=embeddings)
+
+        default_intents = [iid for iid, _ in intent_mix]
+        validated = []
+        for (q, question_text), embedding, (is_dup, max_sim) in zip(candidates, embeddings, checks):
             if is_dup:
                 self._total_rejected_duplicates += 1
                 logger.debug("Rejected duplicate (sim=%.3f): %s", max_sim, question_text[:60])
                 continue
 
             # Track the accepted question
-            self.similarity_checker.add_generated_question(question_text)
+            self.similarity_checker.add_generated_question(question_text, embedding=embedding)
 
             validated.append({
                 "question": question_text,
                 "intents": intent_mix,
                 "difficulty": difficulty,
                 "confusion_points": q.get("confusion_points", []),
-                "expected_intents": q.get("expected_intents", [iid for iid, _ in intent_mix]),
+                "expected_intents": q.get("expected_intents", default_intents),
                 "similarity_score": max_sim,
                 "provider": self._last_provider,
                 "model": self._last_model,
@@ -248,14 +460,27 @@ class QuestionGenerator:
 
     # ── Helpers ──────────────────────────────────────────────────────────
 
+    def _representative_query(
+        self,
+        intent_mix: List[Tuple[int, float]],
+        intent_details: List[Dict],
+    ) -> str:
+        """Representative query for an intent mix, built once per distinct mix."""
+        key = tuple(iid for iid, _ in intent_mix)
+        query = self._query_cache.get(key)
+        if query is None:
+            query = self._build_representative_query(intent_details)
+            self._query_cache[key] = query
+        return query
+
     @staticmethod
     def _build_representative_query(intent_details: List[Dict]) -> str:
         """Build a representative query string for similarity search."""
-        parts = []
-        for d in intent_details:
-            parts.append(d["name"])
-            parts.extend(d.get("key_signals", [])[:3])
-        return " ".join(parts)
+        return " ".join(
+            part
+            for d in intent_details
+            for part in (d["name"], *d.get("key_signals", [])[:3])
+        )
 
     @property
     def stats(self) -> Dict:
@@ -0,0 +1,140 @@
+"""
+Rate Limiter — per-provider request/token budgets for LLM calls.
+
+Each provider model is wrapped in a RateLimitedModel so that FallbackModel
+only dispatches to a provider key once its RPM/TPM budget allows it, and
+HTTP 429 responses are retried with jittered exponential backoff before
+falling through to the next provider.
+"""
+
+import random
+import asyncio
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, Tuple
+
+from aiolimiter import AsyncLimiter
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.models.wrapper import WrapperModel
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderLimiter:
+    """
+    Request and token budget for a single provider API key.
+
+    Uses two leaky buckets over a 60s window: one for requests (RPM) and
+    one for estimated prompt tokens (TPM). A limit of 0 disables the bucket.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = AsyncLimiter(rpm, 60) if rpm else None
+        self._tokens = AsyncLimiter(tpm, 60) if tpm else None
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait until both the request and token budgets have capacity."""
+        if self._requests is not None:
+            await self._requests.acquire()
+        if self._tokens is not None and estimated_tokens > 0:
+            # AsyncLimiter rejects amounts larger than its capacity
+            await self._tokens.acquire(min(estimated_tokens, self.tpm))
+
+
+# One limiter per (provider, api_key) — each key is its own quota bucket
+_limiters: Dict[Tuple[str, str], ProviderLimiter] = {}
+
+
+def get_limiter(config, provider: str, api_key: str) -> ProviderLimiter:
+    """Return the shared limiter for a provider key, creating it on first use."""
+    key = (provider, api_key)
+    if key not in _limiters:
+        _limiters[key] = ProviderLimiter(
+            rpm=config.PROVIDER_RPM.get(provider, 0),
+            tpm=config.PROVIDER_TPM.get(provider, 0),
+        )
+    return _limiters[key]
+
+
+def _estimate_tokens(messages) -> int:
+    """Rough prompt-token estimate (~4 characters per token)."""
+    chars = 0
+    for msg in messages:
+        for part in getattr(msg, "parts", []):
+            content = getattr(part, "content", "")
+            chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 4
+
+
+class RateLimitedModel(WrapperModel):
+    """
+    pydantic-ai model wrapper that enforces a ProviderLimiter.
+
+    On HTTP 429 the request is retried up to ``max_retries`` times with
+    jittered exponential backoff; after that the error propagates so
+    FallbackModel can move on to the next provider.
+    """
+
+    def __init__(
+        self,
+        wrapped,
+        limiter: ProviderLimiter,
+        provider: str,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ):
+        super().__init__(wrapped)
+        self.limiter = limiter
+        self.provider = provider
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    async def _backoff_or_raise(self, error: ModelHTTPError, attempt: int):
+        """Sleep before retrying a 429; re-raise anything else or the last attempt."""
+        if error.status_code != 429 or attempt == self.max_retries:
+            raise error
+        delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        logger.warning(
+            "%s rate limited (429), retry %d/%d in %.1fs",
+            self.provider, attempt + 1, self.max_retries, delay,
+        )
+        await asyncio.sleep(delay)
+
+    async def request(self, messages, *args, **kwargs):
+        estimated_tokens = _estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(estimated_tokens)
+            try:
+                return await self.wrapped.request(messages, *args, **kwargs)
+            except ModelHTTPError as e:
+                await self._backoff_or_raise(e, attempt)
+
+    @asynccontextmanager
+    async def request_stream(self, messages, *args, **kwargs):
+        estimated_tokens = _estimate_tokens(messages)
+        async with AsyncExitStack() as stack:
+            # Only opening the stream is retried; once the first chunk has
+            # been yielded a 429 can no longer be replayed transparently
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.acquire(estimated_tokens)
+                try:
+                    stream = await stack.enter_async_context(
+                        self.wrapped.request_stream(messages, *args, **kwargs)
+                    )
+                    break
+                except ModelHTTPError as e:
+                    await self._backoff_or_raise(e, attempt)
+            yield stream
+
+
+def rate_limited(model, config, provider: str, api_key: str) -> RateLimitedModel:
+    """Wrap a provider model with the shared limiter for its API key."""
+    return RateLimitedModel(
+        model,
+        limiter=get_limiter(config, provider, api_key),
+        provider=provider,
+        max_retries=config.RATE_LIMIT_RETRIES,
+        backoff=config.RATE_LIMIT_BACKOFF,
+    )
@@ -2,7 +2,13 @@
 Similarity Checker — prevents duplicate questions using cosine similarity.
 """
 
+import asyncio
+import hashlib
 import logging
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 from typing import List, Tuple, Optional
@@ -10,6 +16,47 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+SIMILARITY_INDEXES = {"exact", "flat", "hnsw"}
+SIMILARITY_KERNELS = {"numpy", "simsimd", "simsimd-i8", "numba"}
+EMBEDDING_DTYPES = {"float32", "float16"}
+
+
+@functools.cache
+def _numba_max_dot():
+    """
+    Compile a fused ``(queries @ matrix.T).max(axis=1)`` kernel with numba.
+
+    Rows are split into one chunk per thread and each chunk keeps a running
+    max per query, so no similarity matrix is allocated and there is no
+    second pass. Returns None if numba is not installed.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def max_dot(matrix, queries):
+        n_rows, dim = matrix.shape
+        n_queries = queries.shape[0]
+        n_chunks = numba.get_num_threads()
+        chunk = (n_rows + n_chunks - 1) // n_chunks
+        partial = np.full((n_chunks, n_queries), -1.0, dtype=np.float32)
+        for c in numba.prange(n_chunks):
+            for i in range(c * chunk, min((c + 1) * chunk, n_rows)):
+                for q in range(n_queries):
+                    s = np.float32(0.0)
+                    for j in range(dim):
+                        s += matrix[i, j] * queries[q, j]
+                    if s > partial[c, q]:
+                        partial[c, q] = s
+        best = np.empty(n_queries, dtype=np.float32)
+        for q in range(n_queries):
+            best[q] = partial[:, q].max()
+        return best
+
+    return max_dot
+
 
 class SimilarityChecker:
     """
@@ -17,8 +64,15 @@ class SimilarityChecker:
 
     Uses cosine similarity between sentence-transformer embeddings.
     Tracks both existing questions and newly generated ones.
+
+    Every stored or returned embedding is L2-normalized, so cosine
+    similarity is a plain dot product.
     """
 
+    SCAN_BLOCK_ROWS = 2048            # Rows per block in early-exit duplicate scans
+    ALIGNMENT = 64                    # Byte alignment of embedding buffers (one cache line)
+    PARALLEL_SCAN_MIN_ROWS = 100_000  # Smallest matrix split across SCAN_THREADS
+
     def __init__(self, config, embedding_model=None):
         """
         Args:
@@ -29,65 +83,453 @@ class SimilarityChecker:
         self.model = embedding_model
 
         # Load existing data
-        self.questions_df = self._load_questions(config.QUESTIONS_CSV_PATH)
-        self.existing_embeddings = self._load_embeddings(config.EMBEDDINGS_CSV_PATH)
+        self.existing_questions = self._load_questions(config.QUESTIONS_CSV_PATH)
+        self.existing_embeddings = self._load_embeddings(
+            config.EMBEDDINGS_CSV_PATH, getattr(config, "EMBEDDINGS_NPY_PATH", None),
+        )
+        dtype = getattr(config, "EMBEDDING_DTYPE", "float32")
+        if dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unknown embedding dtype: {dtype}")
+        if dtype == "float16":
+            # Scans are memory-bound: half the bytes, upcast per block
+            self.existing_embeddings = self.existing_embeddings.astype(np.float16)
 
         # Track generated questions
         self.generated_questions: List[str] = []
-        self.generated_embeddings: List[np.ndarray] = []
+
+        # LRU cache of text embeddings, keyed by a digest of the text
+        self._embed_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._embed_cache_size = getattr(config, "EMBEDDING_CACHE_SIZE", 10_000)
+
+        # Serializes model calls: prefetch_embeddings encodes in worker
+        # threads while the loop thread may call encode/encode_many, and the
+        # model's fast tokenizer is not safe to use from two threads at once
+        self._model_lock = threading.Lock()
+
+        # Optional ANN index over the existing bank (None = exact scan)
+        self._index = self._build_index()
+
+        # Optional SIMD kernels for exact scans (None = NumPy/BLAS)
+        self._simsimd = self._load_kernel()
+
+        # Fused dot+max kernel for duplicate-check scans (None = NumPy)
+        self._max_dot = None
+        if getattr(config, "SIMILARITY_KERNEL", "numpy") == "numba":
+            self._max_dot = _numba_max_dot()
+            if self._max_dot is None:
+                logger.warning("numba not installed, falling back to NumPy similarity")
+
+        # Persistent pool for row-block scans of large banks (None = one
+        # block at a time). NumPy releases the GIL inside BLAS, so blocks
+        # run on separate cores.
+        self._scan_threads = getattr(config, "SCAN_THREADS", 0)
+        self._scan_pool = None
+        if self._scan_threads > 1:
+            self._scan_pool = ThreadPoolExecutor(self._scan_threads, "similarity-scan")
+
+        # int8 copy of the existing bank for 'simsimd-i8' scans (None = float32)
+        self._existing_i8 = None
+        if (self._simsimd is not None and self.existing_embeddings.size > 0
+                and self.config.SIMILARITY_KERNEL == "simsimd-i8"):
+            self._existing_i8 = self._quantize(self.existing_embeddings)
+
+        # Generated embeddings live in a preallocated matrix that doubles when
+        # full; rows [0, _gen_count) are valid (see generated_embeddings)
+        self._gen_matrix: Optional[np.ndarray] = None
+        self._gen_count = 0
+
+        # An exactly-scanned float32 bank is read in early-exit blocks for
+        # duplicate checks (see _max_similarity). It stays as loaded, so a
+        # memory-mapped bank is never copied.
+        self._scan_existing = (
+            self._index is None and self._existing_i8 is None
+            and self.existing_embeddings.size > 0
+            and self.existing_embeddings.dtype == np.float32
+        )
 
         logger.info(
             "SimilarityChecker ready: %d existing questions, embedding dim=%d",
-            len(self.questions_df),
+            len(self.existing_questions),
             self.existing_embeddings.shape[1] if self.existing_embeddings.size > 0 else 0,
         )
 
     # ── Data Loading ─────────────────────────────────────────────────────
 
     @staticmethod
-    def _load_questions(path: Path) -> pd.DataFrame:
-        """Load questions CSV."""
-        df = pd.read_csv(path)
-        logger.info("Loaded %d questions from %s", len(df), path)
-        return df
+    def _load_questions(path: Path) -> List[str]:
+        """Load the question texts (first column) of the questions CSV."""
+        df = pd.read_csv(path, usecols=[0])
+        questions = df.iloc[:, 0].astype(str).tolist()
+        logger.info("Loaded %d questions from %s", len(questions), path)
+        return questions
+
+    @classmethod
+    def _load_embeddings(cls, path: Path, npy_path: Optional[Path] = None) -> np.ndarray:
+        """
+        Load pre-computed embeddings as a unit-normalized numpy array.
 
-    @staticmethod
-    def _load_embeddings(path: Path) -> np.ndarray:
-        """Load pre-computed embeddings as a numpy array."""
-        df = pd.read_csv(path)
-        embeddings = df.values.astype(np.float32)
+        The CSV is parsed once and its normalized float32 rows are written
+        to ``npy_path``; later runs memory-map that file read-only instead
+        (re-converting whenever the CSV is newer).
+        """
+        if npy_path is not None:
+            npy_path = Path(npy_path)
+            if npy_path.exists() and npy_path.stat().st_mtime >= Path(path).stat().st_mtime:
+                embeddings = np.load(npy_path, mmap_mode="r")
+                logger.info("Memory-mapped embeddings: shape=%s from %s", embeddings.shape, npy_path)
+                return embeddings
+
+        # Float-only input: fixed dtype skips per-column inference, and the
+        # single float32 block converts without a copy
+        df = pd.read_csv(path, dtype=np.float32, engine="c")
+        embeddings = cls._normalize(df.to_numpy(copy=False))
         logger.info("Loaded embeddings: shape=%s", embeddings.shape)
+
+        if npy_path is not None:
+            try:
+                np.save(npy_path, embeddings)
+                logger.info("Wrote normalized embeddings to %s", npy_path)
+            except OSError as e:
+                logger.warning("Could not write %s: %s", npy_path, e)
         return embeddings
 
+    # ── Reference Index ──────────────────────────────────────────────────
+
+    def _build_index(self):
+        """
+        Build a FAISS index over the existing embeddings.
+
+        'flat' is an exact inner-product index (blocked SIMD scan with a
+        top-k heap instead of a full sort); 'hnsw' is approximate and
+        sub-linear for large banks. Returns None when SIMILARITY_INDEX is
+        'exact', the bank is empty, or faiss is not installed; callers then
+        fall back to a NumPy scan.
+        """
+        kind = getattr(self.config, "SIMILARITY_INDEX", "exact")
+        if kind not in SIMILARITY_INDEXES:
+            raise ValueError(f"Unknown similarity index: {kind}")
+        if kind == "exact" or self.existing_embeddings.size == 0:
+            return None
+
+        try:
+            import faiss
+        except ImportError:
+            logger.warning("faiss not installed, falling back to exact similarity search")
+            return None
+
+        vectors = np.asarray(self.existing_embeddings, dtype=np.float32)
+        if kind == "flat":
+            index = faiss.IndexFlatIP(vectors.shape[1])
+        else:
+            index = faiss.IndexHNSWFlat(vectors.shape[1], self.config.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = self.config.HNSW_EF_SEARCH
+        index.add(vectors)
+        logger.info("Built %s index over %d existing questions", kind, index.ntotal)
+        return index
+
+    def _load_kernel(self):
+        """
+        Import simsimd when SIMILARITY_KERNEL is 'simsimd' or 'simsimd-i8'.
+
+        Returns None for 'numpy' and 'numba' or when simsimd is not
+        installed; the similarity routines then use NumPy matrix products.
+        """
+        kind = getattr(self.config, "SIMILARITY_KERNEL", "numpy")
+        if kind not in SIMILARITY_KERNELS:
+            raise ValueError(f"Unknown similarity kernel: {kind}")
+        if kind in ("numpy", "numba"):
+            return None
+
+        try:
+            import simsimd
+        except ImportError:
+            logger.warning("simsimd not installed, falling back to NumPy similarity")
+            return None
+        return simsimd
+
+    @staticmethod
+    def _quantize(vectors: np.ndarray) -> np.ndarray:
+        """Symmetric per-row int8 quantization (cosine is scale-invariant)."""
+        peak = np.abs(vectors).max(axis=1, keepdims=True)
+        peak[peak == 0] = 1.0
+        return np.round(vectors * (127.0 / peak)).astype(np.int8)
+
+    @classmethod
+    def _aligned_empty(cls, shape) -> np.ndarray:
+        """
+        Uninitialized C-contiguous float32 array whose data starts on an
+        ALIGNMENT-byte boundary.
+
+        np.empty only guarantees 16 bytes; over-allocate and slice to the
+        first boundary so SIMD/BLAS kernels get aligned loads.
+        """
+        nbytes = int(np.prod(shape)) * 4
+        raw = np.empty(nbytes + cls.ALIGNMENT, dtype=np.uint8)
+        start = -raw.ctypes.data % cls.ALIGNMENT
+        return raw[start:start + nbytes].view(np.float32).reshape(shape)
+
+    @classmethod
+    def _normalize(cls, vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows into an aligned, contiguous float32 array (inner product = cosine)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Row-wise dot with itself: no squared temporary, unlike np.linalg.norm
+        norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))[:, np.newaxis]
+        norms[norms == 0] = 1.0
+        return np.divide(vectors, norms, out=cls._aligned_empty(vectors.shape))
+
+    def _max_existing_similarity(
+        self,
+        queries: np.ndarray,
+        stop_at: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Highest similarity to any existing question, for each query row.
+
+        An exactly-scanned float32 bank honours ``stop_at`` (see
+        _max_similarity); an index or a quantized bank is always searched whole.
+        """
+        if self._index is not None:
+            sims, _ = self._index.search(queries, 1)
+            return sims[:, 0]
+        if self._scan_existing:
+            return self._max_similarity(queries, self.existing_embeddings, stop_at)
+        return self._existing_similarity(queries).max(axis=1)
+
+    def _existing_similarity(self, queries: np.ndarray) -> np.ndarray:
+        """
+        (n_queries, n_existing) similarities to the existing bank.
+
+        With the int8 bank this is an approximation (error around 1e-3);
+        callers that rank results rescore the winners in float32.
+        """
+        if self._existing_i8 is not None:
+            distances = np.asarray(self._simsimd.cdist(
+                self._quantize(queries), self._existing_i8, metric="cosine",
+            ))
+            return (1.0 - distances).astype(np.float32)
+        if self.existing_embeddings.dtype == np.float16:
+            return self._half_similarity(queries)
+        if self._scan_pool is not None and len(self.existing_embeddings) >= self.PARALLEL_SCAN_MIN_ROWS:
+            return self._parallel_similarity_matrix(queries, self.existing_embeddings)
+        return self._cosine_similarity_matrix(queries, self.existing_embeddings)
+
+    def _half_similarity(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Similarities to the float16 bank: simsimd's native f16 kernel, or
+        NumPy products over blocks upcast to float32 one at a time.
+        """
+        bank = self.existing_embeddings
+        if self._simsimd is not None:
+            distances = np.asarray(self._simsimd.cdist(queries.astype(np.float16), bank, metric="cosine"))
+            return (1.0 - distances).astype(np.float32)
+
+        sims = np.empty((len(queries), len(bank)), dtype=np.float32)
+        for start in range(0, len(bank), self.SCAN_BLOCK_ROWS):
+            block = bank[start:start + self.SCAN_BLOCK_ROWS].astype(np.float32)
+            np.matmul(queries, block.T, out=sims[:, start:start + len(block)])
+        return sims
+
     # ── Embedding ────────────────────────────────────────────────────────
 
     def encode(self, text: str) -> np.ndarray:
-        """Encode a single text into an embedding vector."""
+        """Encode a single text into a unit-normalized embedding (LRU-cached)."""
+        key = self._cache_key(text)
+        cached = self._embed_cache.get(key)
+        if cached is not None:
+            self._embed_cache.move_to_end(key)
+            return cached
+
         if self.model is None:
             raise RuntimeError("Embedding model not loaded. Cannot encode text.")
-        embedding = self.model.encode([text], show_progress_bar=False)
-        return embedding[0].astype(np.float32)
+        embedding = self._normalize(self._model_encode([text]))[0]
+        self._cache_put(key, embedding)
+        return embedding
+
+    def encode_many(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Encode several texts with one batched model call (LRU-cached).
+
+        Cache misses are sorted by length before encoding so each model
+        batch pads to similar lengths. Returns an (n, dim) unit-normalized
+        float32 array aligned with ``texts``.
+        """
+        keys = [self._cache_key(t) for t in texts]
+        missing = {k: t for k, t in zip(keys, texts) if k not in self._embed_cache}
+
+        if missing:
+            if self.model is None:
+                raise RuntimeError("Embedding model not loaded. Cannot encode text.")
+            miss_keys = sorted(missing, key=lambda k: len(missing[k]))
+            encoded = self._normalize(self._model_encode(
+                [missing[k] for k in miss_keys], batch_size=batch_size,
+            ))
+            for k, emb in zip(miss_keys, encoded):
+                self._cache_put(k, emb)
+
+        vectors = []
+        for k in keys:
+            self._embed_cache.move_to_end(k)
+            vectors.append(self._embed_cache[k])
+        return np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    async def prefetch_embeddings(self, texts: List[str]):
+        """
+        Encode uncached texts in a worker thread and add them to the cache.
+
+        The model call runs off the event loop, so it can overlap with LLM
+        streaming; the cache itself is only touched on the loop thread.
+        """
+        missing = {self._cache_key(t): t for t in texts}
+        missing = {k: t for k, t in missing.items() if k not in self._embed_cache}
+        if not missing or self.model is None:
+            return
+        encoded = await asyncio.to_thread(self._model_encode, list(missing.values()))
+        for k, emb in zip(missing, self._normalize(encoded)):
+            self._cache_put(k, emb)
+
+    def _model_encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Run the embedding model on ``texts``, one call at a time."""
+        with self._model_lock:
+            return self.model.encode(texts, show_progress_bar=False, **kwargs)
+
+    # ── Embedding Cache ──────────────────────────────────────────────────
+
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        """Fixed-size digest of a text, used as the embedding cache key."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _cache_put(self, key: str, embedding: np.ndarray):
+        """Insert into the LRU cache, evicting the oldest entries if full."""
+        self._embed_cache[key] = embedding
+        self._embed_cache.move_to_end(key)
+        while len(self._embed_cache) > self._embed_cache_size:
+            self._embed_cache.popitem(last=False)
+
+    def save_embedding_cache(self, path: Path):
+        """Persist the embedding cache so later runs skip re-encoding."""
+        if not self._embed_cache:
+            return
+        np.savez(
+            path,
+            model=np.array(self.config.EMBEDDING_MODEL),
+            keys=np.array(list(self._embed_cache.keys())),
+            vectors=np.stack(list(self._embed_cache.values())),
+        )
+        logger.info("Saved %d cached embeddings to %s", len(self._embed_cache), path)
+
+    def load_embedding_cache(self, path: Path) -> int:
+        """Load a cache written by save_embedding_cache. Returns entries loaded."""
+        path = Path(path)
+        if not path.exists():
+            return 0
+        try:
+            with np.load(path) as data:
+                if str(data["model"]) != self.config.EMBEDDING_MODEL:
+                    logger.info("Ignoring embedding cache built with %s", data["model"])
+                    return 0
+                for key, vec in zip(data["keys"], self._normalize(data["vectors"])):
+                    self._cache_put(str(key), vec)
+        except Exception as e:
+            logger.warning("Could not load embedding cache %s: %s", path, e)
+            return 0
+        logger.info("Loaded %d cached embeddings from %s", len(self._embed_cache), path)
+        return len(self._embed_cache)
 
     # ── Similarity Computation ───────────────────────────────────────────
 
     @staticmethod
     def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-        """Compute cosine similarity between two vectors."""
-        norm_a = np.linalg.norm(a)
-        norm_b = np.linalg.norm(b)
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return float(np.dot(a, b) / (norm_a * norm_b))
+        """Compute cosine similarity between two unit-normalized vectors."""
+        return float(np.dot(a, b))
 
     def _cosine_similarity_batch(self, query_vec: np.ndarray, matrix: np.ndarray) -> np.ndarray:
-        """Compute cosine similarity between a query vector and a matrix of vectors."""
-        norms = np.linalg.norm(matrix, axis=1)
-        query_norm = np.linalg.norm(query_vec)
-        # Avoid division by zero
-        safe_norms = np.where(norms == 0, 1.0, norms)
-        safe_query_norm = max(query_norm, 1e-10)
-        similarities = np.dot(matrix, query_vec) / (safe_norms * safe_query_norm)
-        return similarities
+        """Cosine similarity of a unit query against unit matrix rows (one GEMV)."""
+        if self._simsimd is not None:
+            return self._cosine_similarity_matrix(query_vec[np.newaxis], matrix)[0]
+        return matrix @ query_vec
+
+    def _max_similarity(
+        self,
+        queries: np.ndarray,
+        matrix: np.ndarray,
+        stop_at: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Highest cosine similarity of each unit query row to any unit matrix row.
+
+        Rows are scanned in SCAN_BLOCK_ROWS blocks, each reduced by the numba
+        kernel when enabled. Without numba, a large matrix is read a wave of
+        SCAN_THREADS blocks at a time, run concurrently on the scan pool.
+        With ``stop_at``, a query whose maximum reaches it is left out of
+        later blocks and the scan ends once every query has; its value is
+        then at least ``stop_at`` but not necessarily the global maximum.
+        """
+        wave = 1
+        if (self._scan_pool is not None and self._max_dot is None
+                and len(matrix) >= self.PARALLEL_SCAN_MIN_ROWS):
+            wave = self._scan_threads
+        step = self.SCAN_BLOCK_ROWS
+
+        best = np.full(len(queries), -1.0, dtype=np.float32)
+        active = np.arange(len(queries))
+        for start in range(0, len(matrix), wave * step):
+            pending = queries[active]
+            blocks = [matrix[s:s + step] for s in range(start, min(start + wave * step, len(matrix)), step)]
+            if len(blocks) > 1:
+                block_max = np.max(list(self._scan_pool.map(
+                    lambda block: self._block_max(pending, block), blocks,
+                )), axis=0)
+            else:
+                block_max = self._block_max(pending, blocks[0])
+            best[active] = np.maximum(best[active], block_max)
+            if stop_at is not None:
+                active = active[best[active] < stop_at]
+                if not active.size:
+                    break
+        return best
+
+    def _block_max(self, queries: np.ndarray, block: np.ndarray) -> np.ndarray:
+        """Per-query maximum similarity to the rows of one block."""
+        if self._max_dot is not None:
+            return self._max_dot(block, queries)
+        return self._cosine_similarity_matrix(queries, block).max(axis=1)
+
+    def _max_tracked_similarity(self, queries: np.ndarray, stop_at: float) -> np.ndarray:
+        """
+        Highest similarity of each query row to the existing and generated banks.
+
+        The generated rows are only scanned for queries that found no match
+        (>= ``stop_at``) in the existing bank.
+        """
+        best = np.zeros(len(queries), dtype=np.float32)
+        if self.existing_embeddings.size > 0:
+            best = np.maximum(best, self._max_existing_similarity(queries, stop_at))
+        if self._gen_count:
+            pending = np.flatnonzero(best < stop_at)
+            if pending.size:
+                best[pending] = np.maximum(best[pending], self._max_similarity(
+                    queries[pending], self.generated_embeddings, stop_at,
+                ))
+        return best
+
+    def _parallel_similarity_matrix(self, queries: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """(n_queries, n_rows) similarities, row blocks computed concurrently on the scan pool."""
+        sims = np.empty((len(queries), len(matrix)), dtype=np.float32)
+        bounds = np.linspace(0, len(matrix), self._scan_threads + 1, dtype=np.int64)
+
+        def fill(lo, hi):
+            sims[:, lo:hi] = self._cosine_similarity_matrix(queries, matrix[lo:hi])
+
+        list(self._scan_pool.map(fill, bounds[:-1], bounds[1:]))
+        return sims
+
+    def _cosine_similarity_matrix(self, queries: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Cosine similarity between every unit query row and every unit matrix row."""
+        if self._simsimd is not None:
+            distances = np.asarray(self._simsimd.cdist(queries, matrix, metric="cosine"))
+            return (1.0 - distances).astype(np.float32)
+        return queries @ matrix.T
 
     # ── Duplicate Detection ──────────────────────────────────────────────
 
@@ -95,28 +537,28 @@ class SimilarityChecker:
         self,
         new_question: str,
         threshold: Optional[float] = None,
+        embedding: Optional[np.ndarray] = None,
     ) -> Tuple[bool, float]:
         """
         Check if the question is too similar to any existing or generated question.
 
+        The scan stops at the first block containing a match, so for a
+        duplicate the returned similarity is at least ``threshold`` but not
+        necessarily the global maximum; for a non-duplicate it is exact.
+
+        Pass ``embedding`` when the caller already has it (e.g. to reuse
+        for add_generated_question) to skip encoding the question again.
+
         Returns:
             (is_duplicate: bool, max_similarity: float)
         """
         threshold = threshold or self.config.DUPLICATE_THRESHOLD
-        query_emb = self.encode(new_question)
-
-        max_sim = 0.0
-
-        # Check against existing questions
-        if self.existing_embeddings.size > 0:
-            sims = self._cosine_similarity_batch(query_emb, self.existing_embeddings)
-            max_sim = max(max_sim, float(np.max(sims)))
+        if embedding is None:
+            query_emb = self.encode(new_question)
+        else:
+            query_emb = self._normalize(embedding[np.newaxis])[0]
 
-        # Check against previously generated questions
-        if self.generated_embeddings:
-            gen_matrix = np.array(self.generated_embeddings, dtype=np.float32)
-            sims = self._cosine_similarity_batch(query_emb, gen_matrix)
-            max_sim = max(max_sim, float(np.max(sims)))
+        max_sim = float(self._max_tracked_similarity(query_emb[np.newaxis], threshold)[0])
 
         is_dup = max_sim >= threshold
         if is_dup:
@@ -124,6 +566,52 @@ class SimilarityChecker:
                          max_sim, threshold, new_question[:80])
         return is_dup, max_sim
 
+    def is_duplicate_batch(
+        self,
+        questions: List[str],
+        threshold: Optional[float] = None,
+        embeddings: Optional[np.ndarray] = None,
+    ) -> List[Tuple[bool, float]]:
+        """
+        Batched is_duplicate: one encode call and one blocked scan per bank.
+
+        Each question leaves the scan once it has a match, so as in
+        is_duplicate a duplicate's similarity is only known to be at least
+        ``threshold``. Questions are also checked against earlier
+        non-duplicate questions in the same batch, matching a sequential
+        check-then-add loop.
+
+        Returns:
+            List of (is_duplicate, max_similarity) aligned with ``questions``.
+        """
+        if not questions:
+            return []
+        threshold = threshold or self.config.DUPLICATE_THRESHOLD
+        if embeddings is None:
+            embeddings = self.encode_many(questions)
+        else:
+            embeddings = self._normalize(embeddings)
+
+        # Check against existing and previously generated questions
+        max_sims = self._max_tracked_similarity(embeddings, threshold)
+
+        # Check against questions accepted earlier in this batch
+        intra = self._cosine_similarity_matrix(embeddings, embeddings)
+        accepted: List[int] = []
+        results = []
+        for i, question in enumerate(questions):
+            max_sim = float(max_sims[i])
+            if accepted:
+                max_sim = max(max_sim, float(intra[i, accepted].max()))
+            is_dup = max_sim >= threshold
+            if is_dup:
+                logger.debug("Duplicate detected (sim=%.3f >= %.3f): %s",
+                             max_sim, threshold, question[:80])
+            else:
+                accepted.append(i)
+            results.append((is_dup, max_sim))
+        return results
+
     # ── Tracking ─────────────────────────────────────────────────────────
 
     def add_generated_question(self, question: str, embedding: Optional[np.ndarray] = None):
@@ -131,7 +619,24 @@ class SimilarityChecker:
         self.generated_questions.append(question)
         if embedding is None:
             embedding = self.encode(question)
-        self.generated_embeddings.append(embedding)
+        else:
+            embedding = self._normalize(embedding[np.newaxis])[0]
+
+        if self._gen_matrix is None:
+            self._gen_matrix = self._aligned_empty((256, embedding.shape[0]))
+        elif self._gen_count == len(self._gen_matrix):
+            grown = self._aligned_empty((2 * len(self._gen_matrix), self._gen_matrix.shape[1]))
+            grown[:self._gen_count] = self._gen_matrix
+            self._gen_matrix = grown
+        self._gen_matrix[self._gen_count] = embedding
+        self._gen_count += 1
+
+    @property
+    def generated_embeddings(self) -> np.ndarray:
+        """(n_generated, dim) view of the generated embeddings (no copy)."""
+        if self._gen_matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._gen_matrix[:self._gen_count]
 
     # ── Reference Retrieval ──────────────────────────────────────────────
 
@@ -147,28 +652,62 @@ class SimilarityChecker:
         Returns:
             List of (question_text, similarity_score) tuples, sorted descending.
         """
-        min_sim = min_similarity or self.config.SIMILAR_REFERENCE_THRESHOLD
-        query_emb = self.encode(query)
-
-        if self.existing_embeddings.size == 0:
-            return []
+        return self.find_similar_questions_batch([query], top_k, min_similarity)[0]
 
-        sims = self._cosine_similarity_batch(query_emb, self.existing_embeddings)
-        top_indices = np.argsort(sims)[::-1][:top_k * 2]  # get extra, then filter
+    def find_similar_questions_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        min_similarity: Optional[float] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        find_similar_questions for several queries: one encode call and one
+        (n_queries, n_existing) matrix product (or one index search).
 
-        results = []
-        question_col = self.questions_df.columns[0]  # 'question'
-        for idx in top_indices:
-            score = float(sims[idx])
-            if score >= min_sim:
-                text = str(self.questions_df.iloc[idx][question_col])
-                results.append((text, score))
-            if len(results) >= top_k:
-                break
+        Returns:
+            One list of (question_text, similarity_score) per query.
+        """
+        if not queries:
+            return []
+        min_sim = min_similarity or self.config.SIMILAR_REFERENCE_THRESHOLD
+        query_embs = self.encode_many(queries)
 
-        return results
+        if self.existing_embeddings.size == 0:
+            return [[] for _ in queries]
+
+        if self._index is not None:
+            scores, top_indices = self._index.search(query_embs, top_k * 2)
+        else:
+            sims = self._existing_similarity(query_embs)
+            # Select the top 2k per row in O(N) (get extra, then filter), then
+            # sort only those
+            k = min(max(top_k * 2, 1), sims.shape[1])
+            top_indices = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            if self._existing_i8 is not None:
+                # Rescore the int8 candidates against the float bank
+                scores = np.einsum("qd,qkd->qk", query_embs, self.existing_embeddings[top_indices])
+            else:
+                scores = np.take_along_axis(sims, top_indices, axis=1)
+            order = np.argsort(-scores, axis=1)
+            top_indices = np.take_along_axis(top_indices, order, axis=1)
+            scores = np.take_along_axis(scores, order, axis=1)
+
+        batch_results = []
+        for row_indices, row_scores in zip(top_indices, scores):
+            results = []
+            for idx, score in zip(row_indices, row_scores):
+                if idx < 0:  # FAISS pads with -1 when fewer hits exist
+                    break
+                score = float(score)
+                if score >= min_sim:
+                    results.append((self.existing_questions[idx], score))
+                if len(results) >= top_k:
+                    break
+            batch_results.append(results)
+
+        return batch_results
 
     @property
     def total_tracked(self) -> int:
         """Total number of questions tracked (existing + generated)."""
-        return len(self.questions_df) + len(self.generated_questions)
+        return len(self.existing_questions) + len(self.generated_questions)
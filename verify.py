@@ -1,11 +1,10 @@
 """Quick verification script for the project (Phase 2)."""
-import ast
 import json
 import pathlib
 import sys
 
 def check_syntax():
-    """Check all Python files parse correctly."""
+    """Check all Python files compile (no AST objects are built)."""
     files = (
         list(pathlib.Path("src").glob("*.py"))
         + [pathlib.Path("main.py"), pathlib.Path("scheduler.py")]
@@ -13,7 +12,7 @@ def check_syntax():
     ok = True
     for f in sorted(files):
         try:
-            ast.parse(f.read_text(encoding="utf-8"))
+            compile(f.read_bytes(), str(f), "exec", dont_inherit=True)
             print(f"  OK: {f}")
         except SyntaxError as e:
             print(f"  FAIL: {f} -> {e}")